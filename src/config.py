@@ -1,4 +1,7 @@
 import os
+import re
+from dataclasses import dataclass, asdict
+from types import MappingProxyType
 from typing import Set, List
 from enum import IntEnum, Enum
 
@@ -15,12 +18,52 @@ class SQLRiskLevel(IntEnum):
     HIGH = 3     # 结构变更（CREATE/ALTER）和无WHERE的数据修改
     CRITICAL = 4 # 危险操作（DROP/TRUNCATE等）
 
+def _compile_blocked_patterns(patterns: List[str]):
+    """
+    将阻止的SQL模式合并编译为一个忽略大小写的正则表达式
+    
+    每个模式按正则表达式处理，无法编译的模式按普通字符串匹配。
+    没有配置模式时返回None。
+    """
+    if not patterns:
+        return None
+    parts = []
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error:
+            pattern = re.escape(pattern)
+        parts.append(f'(?:{pattern})')
+    return re.compile('|'.join(parts), re.IGNORECASE)
+
 # 服务器配置
 class ServerConfig:
     """服务器配置"""
     HOST = os.getenv('HOST', '127.0.0.1')
     PORT = int(os.getenv('PORT', '3000'))
     
+@dataclass(frozen=True, slots=True)
+class DatabaseSettings:
+    """数据库连接配置快照（启动时构建一次，不可变）"""
+    host: str
+    user: str
+    password: str
+    database: str
+    port: int
+    connection_timeout: int
+    auth_plugin: str
+
+@dataclass(frozen=True, slots=True)
+class ConnectionPoolSettings:
+    """数据库连接池配置快照（启动时构建一次，不可变）"""
+    minsize: int
+    maxsize: int
+    pool_recycle: int
+    max_lifetime: int
+    acquire_timeout: float
+    enabled: bool
+    cleanup_interval: float
+
 # 数据库配置
 class DatabaseConfig:
     """数据库连接配置"""
@@ -34,16 +77,19 @@ class DatabaseConfig:
     
     @staticmethod
     def get_config():
-        """获取数据库配置字典"""
-        return {
-            'host': DatabaseConfig.HOST,
-            'user': DatabaseConfig.USER,
-            'password': DatabaseConfig.PASSWORD,
-            'database': DatabaseConfig.DATABASE,
-            'port': DatabaseConfig.PORT,
-            'connection_timeout': DatabaseConfig.CONNECTION_TIMEOUT,
-            'auth_plugin': DatabaseConfig.AUTH_PLUGIN
-        }
+        """获取数据库配置字典（只读，所有调用共享同一实例）"""
+        return _DATABASE_CONFIG_DICT
+
+DATABASE_CONFIG = DatabaseSettings(
+    host=DatabaseConfig.HOST,
+    user=DatabaseConfig.USER,
+    password=DatabaseConfig.PASSWORD,
+    database=DatabaseConfig.DATABASE,
+    port=DatabaseConfig.PORT,
+    connection_timeout=DatabaseConfig.CONNECTION_TIMEOUT,
+    auth_plugin=DatabaseConfig.AUTH_PLUGIN
+)
+_DATABASE_CONFIG_DICT = MappingProxyType(asdict(DATABASE_CONFIG))
 
 # 数据库连接池配置
 class ConnectionPoolConfig:
@@ -60,18 +106,24 @@ class ConnectionPoolConfig:
     ACQUIRE_TIMEOUT = float(os.getenv('DB_POOL_ACQUIRE_TIMEOUT', '10.0'))
     # 是否启用连接池
     ENABLED = os.getenv('DB_POOL_ENABLED', 'true').lower() in ('true', 'yes', '1')
+    # 已关闭连接池的回收周期（秒）
+    CLEANUP_INTERVAL = float(os.getenv('DB_POOL_CLEANUP_INTERVAL', '300'))
     
     @staticmethod
     def get_config():
-        """获取连接池配置字典"""
-        return {
-            'minsize': ConnectionPoolConfig.MIN_SIZE,
-            'maxsize': ConnectionPoolConfig.MAX_SIZE,
-            'pool_recycle': ConnectionPoolConfig.POOL_RECYCLE,
-            'max_lifetime': ConnectionPoolConfig.MAX_LIFETIME,
-            'acquire_timeout': ConnectionPoolConfig.ACQUIRE_TIMEOUT,
-            'enabled': ConnectionPoolConfig.ENABLED
-        }
+        """获取连接池配置字典（只读，所有调用共享同一实例）"""
+        return _CONNECTION_POOL_CONFIG_DICT
+
+CONNECTION_POOL_CONFIG = ConnectionPoolSettings(
+    minsize=ConnectionPoolConfig.MIN_SIZE,
+    maxsize=ConnectionPoolConfig.MAX_SIZE,
+    pool_recycle=ConnectionPoolConfig.POOL_RECYCLE,
+    max_lifetime=ConnectionPoolConfig.MAX_LIFETIME,
+    acquire_timeout=ConnectionPoolConfig.ACQUIRE_TIMEOUT,
+    enabled=ConnectionPoolConfig.ENABLED,
+    cleanup_interval=ConnectionPoolConfig.CLEANUP_INTERVAL
+)
+_CONNECTION_POOL_CONFIG_DICT = MappingProxyType(asdict(CONNECTION_POOL_CONFIG))
 
 # 安全配置
 class SecurityConfig:
@@ -105,11 +157,13 @@ class SecurityConfig:
 
     # 允许的表名
     ALLOWED_TABLE_NAMES_STR = os.getenv('ALLOWED_TABLE_NAMES', '')
-    ALLOWED_TABLE_NAMES = set(ALLOWED_TABLE_NAMES_STR.split(',')) if ALLOWED_TABLE_NAMES_STR else set()
+    ALLOWED_TABLE_NAMES = frozenset(t.strip() for t in ALLOWED_TABLE_NAMES_STR.split(',') if t.strip())
     
     # 阻止的模式
     BLOCKED_PATTERNS_STR = os.getenv('BLOCKED_PATTERNS', '')
     BLOCKED_PATTERNS = [p.strip() for p in BLOCKED_PATTERNS_STR.split(',') if p.strip()]
+    # 合并编译后的阻止模式，每条SQL只需扫描一次（未配置时为None）
+    BLOCKED_PATTERN_RE = _compile_blocked_patterns(BLOCKED_PATTERNS)
     
     # 查询检查
     ENABLE_QUERY_CHECK = os.getenv('ENABLE_QUERY_CHECK', 'true').lower() in ('true', 'yes', '1')
@@ -117,17 +171,26 @@ class SecurityConfig:
 # SQL操作配置
 class SQLConfig:
     """SQL操作相关配置"""
-    # 基础操作集合
-    DDL_OPERATIONS = {
+    # 基础操作集合（不可变，防止运行时被意外修改）
+    DDL_OPERATIONS = frozenset({
         'CREATE', 'ALTER', 'DROP', 'TRUNCATE', 'RENAME'
-    }
+    })
     
-    DML_OPERATIONS = {
+    DML_OPERATIONS = frozenset({
         'SELECT', 'INSERT', 'UPDATE', 'DELETE', 'MERGE'
-    }
+    })
     
     # 元数据操作集合
-    METADATA_OPERATIONS = {
+    METADATA_OPERATIONS = frozenset({
         'SHOW', 'DESC', 'DESCRIBE', 'EXPLAIN', 'HELP', 
         'ANALYZE', 'CHECK', 'CHECKSUM', 'OPTIMIZE'
-    } 
\ No newline at end of file
+    })
+    
+    # 所有支持的操作集合
+    ALL_OPERATIONS = DDL_OPERATIONS | DML_OPERATIONS | METADATA_OPERATIONS
+
+    # 元数据查询结果缓存时间（秒，0表示不缓存）
+    METADATA_CACHE_TTL = float(os.getenv('METADATA_CACHE_TTL', '5'))
+    
+    # 分页查询总记录数缓存时间（秒，0表示不缓存）
+    PAGINATION_COUNT_CACHE_TTL = float(os.getenv('PAGINATION_COUNT_CACHE_TTL', '60'))
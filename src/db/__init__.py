@@ -1,3 +1,14 @@
 """
 MySQL数据库操作包
-""" 
\ No newline at end of file
+"""
+
+# 驱动只在此处检测一次：mysql_operations优先导入asyncmy，未安装时回退到aiomysql
+try:
+    from .mysql_operations import DRIVER_NAME
+    mysql_available = True
+except ImportError as e:
+    # 只有缺少驱动时视为不可用，其他导入错误（如包内模块的问题）照常抛出
+    if (e.name or '').partition('.')[0] not in ('asyncmy', 'aiomysql'):
+        raise
+    DRIVER_NAME = None
+    mysql_available = False
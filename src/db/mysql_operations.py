@@ -1,58 +1,84 @@
 import logging
-import aiomysql
+import re
 import asyncio
+import functools
+import inspect
 import time
-from contextlib import asynccontextmanager
-from typing import Any, Dict, List, Optional, Union
-import threading
+from types import MappingProxyType
+from typing import Any, AsyncGenerator, Dict, List, Mapping, Optional, Tuple, Union
 import weakref
 
-from ..config import DatabaseConfig, SecurityConfig, SQLConfig, ConnectionPoolConfig
+from ..config import DatabaseConfig, ConnectionPoolConfig
 from ..security.sql_analyzer import SQLOperationType
 from ..security.interceptor import SQLInterceptor, SecurityException
 from ..security.sql_parser import SQLParser
 
+# 优先使用asyncmy驱动（协议编解码由Cython实现，大结果集的行解析开销更低），
+# 未安装时回退到纯Python实现的aiomysql。两者接口基本一致，差异由下方辅助函数屏蔽
+try:
+    import asyncmy as aiomysql
+    from asyncmy.cursors import DictCursor, SSDictCursor
+except ImportError:
+    import aiomysql
+    from aiomysql import DictCursor, SSDictCursor
+
+# 实际使用的驱动名称（asyncmy或aiomysql）
+DRIVER_NAME = aiomysql.__name__
+
 logger = logging.getLogger("mysql_server")
 
 # 初始化安全组件
 sql_analyzer = SQLOperationType()
 sql_interceptor = SQLInterceptor(sql_analyzer)
 
-# 全局连接池 - 使用线程本地存储
-_pools = threading.local()
+# 需要提交事务并返回影响行数的修改操作
+_WRITE_OPS = frozenset({'UPDATE', 'DELETE', 'INSERT'})
+# 返回表结构的元数据操作
+_DESCRIBE_OPS = frozenset({'DESC', 'DESCRIBE'})
+
+# 是否启用连接池，禁用时每个请求使用独立的直接连接
+_POOL_ENABLED = ConnectionPoolConfig.get_config()['enabled']
+# 从连接池获取连接的最长等待时间（秒），连接池耗尽时超时报错而不是无限等待
+_ACQUIRE_TIMEOUT = ConnectionPoolConfig.get_config()['acquire_timeout']
+
+# 全局连接池注册表 - 键为事件循环ID
+_pools: Dict[int, aiomysql.Pool] = {}
+
+def _pool_closed(pool: aiomysql.Pool) -> bool:
+    """连接池是否已关闭（asyncmy的连接池没有公开的closed属性，两种驱动都将状态记录在_closed中）"""
+    return pool._closed
 
-# 定期回收无效连接池
-_cleanup_interval = 300  # 秒，可根据需要调整
-_last_cleanup = 0
+async def _open_cursor(connection, cursor_cls=None):
+    """
+    创建游标，兼容两种驱动
+    
+    aiomysql的cursor()是协程，asyncmy的cursor()直接返回游标对象。
+    """
+    cursor = connection.cursor(cursor_cls) if cursor_cls is not None else connection.cursor()
+    if inspect.isawaitable(cursor):
+        cursor = await cursor
+    return cursor
 
 def _cleanup_unused_pools():
-    """回收无效或已关闭的连接池，释放资源"""
-    global _last_cleanup
-    now = time.time()
-    if now - _last_cleanup < _cleanup_interval:
-        return
-    _last_cleanup = now
-    if hasattr(_pools, 'pools'):
-        to_remove = []
-        for loop_id, pool in list(_pools.pools.items()):
-            # 检查事件循环是否还活着
-            if pool.closed:
-                to_remove.append(loop_id)
-                continue
-            # 尝试获取事件循环对象
-            for loop in asyncio.all_tasks():
-                if id(loop.get_loop()) == loop_id:
-                    break
-            else:
-                # 没找到对应事件循环，关闭池
-                pool.close()
-                to_remove.append(loop_id)
-                logger.info(f"检测到无主事件循环，已关闭连接池 (事件循环ID: {loop_id})")
-        for loop_id in to_remove:
-            del _pools.pools[loop_id]
-
-def get_db_config():
-    """动态获取数据库配置"""
+    """
+    回收已关闭的连接池条目
+    
+    事件循环销毁时由init_db_pool注册的finalizer负责关闭并移除对应连接池，
+    这里只清理已关闭但仍留在注册表中的条目，由服务器后台线程定期调用。
+    """
+    for loop_id, pool in list(_pools.items()):
+        if _pool_closed(pool):
+            _pools.pop(loop_id, None)
+            logger.info(f"已回收关闭的连接池 (事件循环ID: {loop_id})")
+
+@functools.lru_cache(maxsize=1)
+def get_db_config() -> Mapping[str, Any]:
+    """
+    获取aiomysql格式的数据库配置
+    
+    配置来源于进程启动时加载的环境变量，运行期间不会变化，因此只构建一次并缓存。
+    返回只读视图，防止调用方修改共享的配置。
+    """
     # 获取基础配置
     config = DatabaseConfig.get_config()
     
@@ -67,30 +93,92 @@ def get_db_config():
         # auth_plugin在aiomysql中不直接支持，忽略此参数
     }
     
-    return aiomysql_config
+    return MappingProxyType(aiomysql_config)
+
+@functools.lru_cache(maxsize=1)
+def _get_db_config_no_db() -> Mapping[str, Any]:
+    """获取不指定数据库的连接配置（只读，缓存），用于SHOW DATABASES等无需数据库的操作"""
+    config = dict(get_db_config())
+    config.pop('db', None)
+    return MappingProxyType(config)
 
 # 自定义异常类，细化错误处理
 class MySQLConnectionError(Exception):
     """数据库连接错误基类"""
-    pass
+    __slots__ = ()
 
 class MySQLAuthError(MySQLConnectionError):
     """认证错误"""
-    pass
+    __slots__ = ()
 
 class MySQLDatabaseNotFoundError(MySQLConnectionError):
     """数据库不存在错误"""
-    pass
+    __slots__ = ()
 
 class MySQLServerError(MySQLConnectionError):
     """服务器连接错误"""
-    pass
+    __slots__ = ()
 
 class MySQLAuthPluginError(MySQLConnectionError):
     """认证插件错误"""
-    pass
+    __slots__ = ()
+
+# MySQL错误码到细化异常类型及错误信息模板的映射
+_ERR_MAP = {
+    1045: (MySQLAuthError, "访问被拒绝，请检查用户名和密码"),                # ER_ACCESS_DENIED_ERROR
+    1049: (MySQLDatabaseNotFoundError, "数据库'{db}'不存在"),                 # ER_BAD_DB_ERROR
+    2002: (MySQLServerError, "无法连接到MySQL服务器，请检查服务是否启动"),      # CR_CONNECTION_ERROR
+    2003: (MySQLServerError, "无法连接到MySQL服务器，请检查服务是否启动"),      # CR_CONN_HOST_ERROR
+    1251: (MySQLAuthPluginError, "认证插件问题: {error}，请尝试修改用户认证方式为mysql_native_password"),  # ER_NOT_SUPPORTED_AUTH_MODE
+    2059: (MySQLAuthPluginError, "认证插件问题: {error}，请尝试修改用户认证方式为mysql_native_password"),  # CR_AUTH_PLUGIN_CANNOT_LOAD
+}
+_DEFAULT_ERR = (MySQLConnectionError, "数据库连接失败: {error}")
 
-async def init_db_pool(min_size: Optional[int] = None, max_size: Optional[int] = None, require_database: bool = True):
+# 错误码缺失或未知时（如驱动层包装的错误），按错误信息单次扫描匹配错误类别
+_ERR_RE = re.compile(
+    r"(?P<auth>Access denied)|(?P<db>Unknown database)|"
+    r"(?P<conn>Can't connect|Connection refused)|(?P<plugin>Authentication plugin)"
+)
+_ERR_KIND_CODES = {'auth': 1045, 'db': 1049, 'conn': 2003, 'plugin': 1251}
+
+def _classify_error(err: aiomysql.Error) -> MySQLConnectionError:
+    """
+    根据MySQL错误码将aiomysql错误转换为细化的连接异常
+    
+    Args:
+        err: aiomysql抛出的错误，args[0]为MySQL错误码
+        
+    Returns:
+        对应的MySQLConnectionError子类实例
+    """
+    error_msg = str(err)
+    code = err.args[0] if err.args else 0
+    if code not in _ERR_MAP:
+        match = _ERR_RE.search(error_msg)
+        code = _ERR_KIND_CODES[match.lastgroup] if match else code
+    exc_cls, template = _ERR_MAP.get(code, _DEFAULT_ERR)
+    return exc_cls(template.format(db=get_db_config().get('db', ''), error=error_msg))
+
+def _resolve_db_config(require_database: bool) -> Mapping[str, Any]:
+    """
+    根据是否要求指定数据库选择连接配置
+    
+    Raises:
+        MySQLDatabaseNotFoundError: 要求指定数据库但未配置数据库名时
+    """
+    db_config = get_db_config()
+    if db_config.get('db'):
+        return db_config
+    
+    # 检查是否需要数据库名
+    if require_database:
+        raise MySQLDatabaseNotFoundError("数据库名称未设置，请检查环境变量MYSQL_DATABASE")
+    
+    # 不需要指定数据库且db为空时，使用不含db参数的配置
+    return _get_db_config_no_db()
+
+async def init_db_pool(min_size: Optional[int] = None, max_size: Optional[int] = None, require_database: bool = True,
+                       loop: Optional[asyncio.AbstractEventLoop] = None):
     """
     初始化数据库连接池
     
@@ -98,27 +186,20 @@ async def init_db_pool(min_size: Optional[int] = None, max_size: Optional[int] =
         min_size: 连接池最小连接数 (可选，默认从配置读取)
         max_size: 连接池最大连接数 (可选，默认从配置读取)
         require_database: 是否要求指定数据库
+        loop: 当前运行中的事件循环 (可选，调用方已获取时传入以避免重复查找)
         
     Returns:
-        连接池对象
+        连接池对象；连接池功能被禁用时返回None，此时get_db_connection使用直接连接
     
     Raises:
         MySQLConnectionError: 连接池初始化失败时
     """
     try:
         # 获取数据库配置
-        db_config = get_db_config()
+        db_config = _resolve_db_config(require_database)
         
-        # 检查是否需要数据库名
-        if require_database and not db_config.get('db'):
-            raise MySQLDatabaseNotFoundError("数据库名称未设置，请检查环境变量MYSQL_DATABASE")
-            
-        # 如果不需要指定数据库，且db为空，则移除db参数
-        if not require_database and not db_config.get('db'):
-            db_config.pop('db', None)
-        
-        # 获取当前事件循环
-        current_loop = asyncio.get_event_loop()
+        # 获取当前运行中的事件循环
+        current_loop = loop if loop is not None else asyncio.get_running_loop()
         loop_id = id(current_loop)
         
         # 获取连接池配置
@@ -129,32 +210,30 @@ async def init_db_pool(min_size: Optional[int] = None, max_size: Optional[int] =
         max_size = max_size if max_size is not None else pool_config['maxsize']
         pool_recycle = pool_config['pool_recycle']
         
-        # 检查是否启用连接池
+        # 检查是否启用连接池 - 禁用时不创建单连接池（会串行化所有并发请求），
+        # 由get_db_connection为每个请求建立直接连接
         if not pool_config['enabled']:
             logger.warning("连接池功能已被禁用，使用直接连接")
-            # 创建单连接的池
-            min_size = 1
-            max_size = 1
+            return None
         
-        # 创建连接池
+        # 创建连接池，aiomysql会在返回前预先建立min_size个连接
         logger.info(f"初始化连接池: 最小连接数={min_size}, 最大连接数={max_size}, 回收时间={pool_recycle}秒")
         pool = await aiomysql.create_pool(
             minsize=min_size,
             maxsize=max_size,
             pool_recycle=pool_recycle,
             echo=False,  # 不记录SQL执行日志，由我们自己的日志系统处理
-            loop=current_loop,  # 显式指定事件循环
             **db_config
         )
         
-        # 将池存储在线程本地存储中，键是事件循环ID
-        if not hasattr(_pools, 'pools'):
-            _pools.pools = {}
-        _pools.pools[loop_id] = pool
+        # 将池存储在全局注册表中，键是事件循环ID
+        _pools[loop_id] = pool
         
         # 注册事件循环关闭时自动清理
         def _finalizer(p=pool, lid=loop_id):
-            if not p.closed:
+            if _pools.get(lid) is p:
+                _pools.pop(lid, None)
+            if not _pool_closed(p):
                 p.close()
                 logger.info(f"事件循环关闭时自动关闭连接池 (事件循环ID: {lid})")
         try:
@@ -169,95 +248,152 @@ async def init_db_pool(min_size: Optional[int] = None, max_size: Optional[int] =
         logger.error(f"数据库连接池初始化失败: {error_msg}")
         
         # 细化错误类型
-        if "Access denied" in error_msg:
-            raise MySQLAuthError("访问被拒绝，请检查用户名和密码")
-        elif "Unknown database" in error_msg:
-            raise MySQLDatabaseNotFoundError(f"数据库'{db_config.get('db', '')}'不存在")
-        elif "Can't connect" in error_msg or "Connection refused" in error_msg:
-            raise MySQLServerError("无法连接到MySQL服务器，请检查服务是否启动")
-        elif "Authentication plugin" in error_msg:
-            raise MySQLAuthPluginError(f"认证插件问题: {error_msg}，请尝试修改用户认证方式为mysql_native_password")
-        else:
-            raise MySQLConnectionError(f"数据库连接失败: {error_msg}")
+        raise _classify_error(err)
     except Exception as e:
         logger.error(f"连接池初始化发生未预期错误: {str(e)}")
         raise MySQLConnectionError(f"连接池初始化失败: {str(e)}")
 
+def _lookup_pool() -> Tuple[asyncio.AbstractEventLoop, int, Optional[aiomysql.Pool]]:
+    """
+    查找当前运行中的事件循环对应的连接池
+    
+    Returns:
+        (事件循环, 事件循环ID, 可用的连接池)，连接池不存在或已关闭时为None
+    """
+    loop = asyncio.get_running_loop()
+    loop_id = id(loop)
+    
+    # 检查是否有此循环的连接池
+    pool = _pools.get(loop_id)
+    # 检查连接池是否已关闭
+    if pool is not None and _pool_closed(pool):
+        logger.debug("连接池已关闭，将重新创建 (事件循环ID: %s)", loop_id)
+        pool = None
+    return loop, loop_id, pool
+
 def get_pool_for_current_loop():
     """获取当前事件循环对应的连接池"""
-    _cleanup_unused_pools()  # 每次获取时尝试回收
     try:
-        # 获取当前事件循环ID
-        current_loop = asyncio.get_event_loop()
-        loop_id = id(current_loop)
-        
-        # 检查是否有此循环的连接池
-        if hasattr(_pools, 'pools') and loop_id in _pools.pools:
-            pool = _pools.pools[loop_id]
-            # 检查连接池是否已关闭
-            if pool.closed:
-                logger.debug(f"连接池已关闭，将重新创建 (事件循环ID: {loop_id})")
-                return None
-            return pool
-        return None
+        return _lookup_pool()[2]
     except Exception as e:
         logger.error(f"获取当前事件循环的连接池失败: {str(e)}")
         return None
 
-@asynccontextmanager
-async def get_db_connection(require_database: bool = True):
+class _DbConnectionContext:
+    """
+    get_db_connection返回的异步上下文管理器
+    
+    显式实现__aenter__/__aexit__，避免asynccontextmanager在每次获取连接时创建生成器帧。
+    """
+    __slots__ = ('_require_database', '_acquire_ctx', '_connection')
+    
+    def __init__(self, require_database: bool):
+        self._require_database = require_database
+        self._acquire_ctx = None
+        self._connection = None
+    
+    async def __aenter__(self):
+        # 获取当前事件循环的连接池
+        loop, _, pool = _lookup_pool()
+        
+        # 如果没有连接池且启用了连接池功能，则初始化一个
+        if pool is None and _POOL_ENABLED:
+            pool = await init_db_pool(require_database=self._require_database, loop=loop)
+        
+        try:
+            if pool is None:
+                # 连接池已禁用，为本次请求建立直接连接，退出时关闭
+                self._connection = await aiomysql.connect(**_resolve_db_config(self._require_database))
+            else:
+                # 从连接池获取连接，超过等待时间时放弃
+                acquire_ctx = pool.acquire()
+                self._connection = await asyncio.wait_for(acquire_ctx.__aenter__(), _ACQUIRE_TIMEOUT)
+                self._acquire_ctx = acquire_ctx
+            return self._connection
+        except asyncio.TimeoutError:
+            logger.error(f"获取数据库连接超时: 连接池在{_ACQUIRE_TIMEOUT}秒内没有空闲连接")
+            raise MySQLConnectionError(f"获取数据库连接超时({_ACQUIRE_TIMEOUT}秒)，连接池已满，请稍后重试")
+        except aiomysql.Error as err:
+            error_msg = str(err)
+            logger.error(f"获取数据库连接失败: {error_msg}")
+            
+            raise _classify_error(err)
+        except MySQLConnectionError:
+            raise
+        except Exception as e:
+            logger.error(f"获取数据库连接时发生未预期错误: {str(e)}")
+            raise MySQLConnectionError(f"获取数据库连接失败: {str(e)}")
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._acquire_ctx is not None:
+            # 将连接归还连接池
+            await self._acquire_ctx.__aexit__(exc_type, exc, tb)
+        elif self._connection is not None:
+            self._connection.close()
+        return False
+
+def get_db_connection(require_database: bool = True) -> _DbConnectionContext:
     """
     从连接池获取数据库连接的异步上下文管理器
     
+    用法示例:
+    async with get_db_connection() as conn:
+        await execute_query(conn, "SELECT ...")
+    
     Args:
         require_database: 是否要求必须指定数据库。设置为False时可以执行如SHOW DATABASES等不需要
                          指定具体数据库的操作。
     
-    Yields:
-        aiomysql.Connection: 数据库连接对象
+    Returns:
+        异步上下文管理器，进入时得到aiomysql.Connection数据库连接对象
     """
-    # 获取当前事件循环的连接池
-    pool = get_pool_for_current_loop()
-    
-    # 如果没有连接池，则初始化一个
-    if pool is None:
-        pool = await init_db_pool(require_database=require_database)
-    
-    try:
-        # 从连接池获取连接
-        async with pool.acquire() as connection:
-            yield connection
-    except aiomysql.Error as err:
-        error_msg = str(err)
-        logger.error(f"获取数据库连接失败: {error_msg}")
-        
-        if "Access denied" in error_msg:
-            raise MySQLAuthError("访问被拒绝，请检查用户名和密码")
-        elif "Unknown database" in error_msg:
-            db_config = get_db_config()
-            raise MySQLDatabaseNotFoundError(f"数据库'{db_config.get('db', '')}'不存在")
-        elif "Can't connect" in error_msg or "Connection refused" in error_msg:
-            raise MySQLServerError("无法连接到MySQL服务器，请检查服务是否启动")
-        elif "Authentication plugin" in error_msg:
-            raise MySQLAuthPluginError(f"认证插件问题: {error_msg}，请尝试修改用户认证方式为mysql_native_password")
-        else:
-            raise MySQLConnectionError(f"数据库连接失败: {error_msg}")
-    except Exception as e:
-        logger.error(f"获取数据库连接时发生未预期错误: {str(e)}")
-        raise MySQLConnectionError(f"获取数据库连接失败: {str(e)}")
+    return _DbConnectionContext(require_database)
 
 async def close_all_pools():
     """关闭所有连接池"""
-    if hasattr(_pools, 'pools'):
-        for loop_id, pool in list(_pools.pools.items()):
-            if not pool.closed:
-                pool.close()
-                await pool.wait_closed()
-                logger.info(f"连接池已关闭 (事件循环ID: {loop_id})")
-        _pools.pools = {}
+    for loop_id, pool in list(_pools.items()):
+        if not _pool_closed(pool):
+            pool.close()
+            await pool.wait_closed()
+            logger.info(f"连接池已关闭 (事件循环ID: {loop_id})")
+    _pools.clear()
+
+class _TransactionContext:
+    """transaction返回的异步上下文管理器，负责begin/commit/rollback"""
+    __slots__ = ('_connection',)
+    
+    def __init__(self, connection):
+        self._connection = connection
+    
+    async def __aenter__(self):
+        try:
+            # 开始事务
+            await self._connection.begin()
+        except Exception as e:
+            await self._rollback(e)
+            raise
+        logger.debug("事务已开始")
+        return self._connection
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            try:
+                # 提交事务
+                await self._connection.commit()
+            except Exception as e:
+                await self._rollback(e)
+                raise
+            logger.debug("事务已提交")
+        elif issubclass(exc_type, Exception):
+            await self._rollback(exc)
+        return False
+    
+    async def _rollback(self, error: BaseException):
+        # 回滚事务
+        await self._connection.rollback()
+        logger.error(f"事务执行失败，已回滚: {str(error)}")
 
-@asynccontextmanager
-async def transaction(connection):
+def transaction(connection) -> _TransactionContext:
     """
     事务上下文管理器
     
@@ -270,40 +406,14 @@ async def transaction(connection):
     Args:
         connection: 数据库连接
         
-    Yields:
-        connection: 事务中的数据库连接
-    """
-    try:
-        # 开始事务
-        await connection.begin()
-        logger.debug("事务已开始")
-        yield connection
-        # 提交事务
-        await connection.commit()
-        logger.debug("事务已提交")
-    except Exception as e:
-        # 回滚事务
-        await connection.rollback()
-        logger.error(f"事务执行失败，已回滚: {str(e)}")
-        raise
-
-def normalize_result(result_rows):
-    """
-    将 DictRow 对象转换为普通字典
-    
-    Args:
-        result_rows: 查询结果行列表
-        
     Returns:
-        包含普通字典的列表
+        异步上下文管理器，进入时得到事务中的数据库连接
     """
-    if not result_rows:
-        return []
-        
-    return [dict(row) for row in result_rows]
+    return _TransactionContext(connection)
 
 async def execute_query(connection, query: str, params: Optional[Dict[str, Any]] = None, 
-                   batch_size: int = 1000, stream_results: bool = False) -> List[Dict[str, Any]]:
+                   batch_size: int = 1000, stream_results: bool = False,
+                   commit: bool = True) -> List[Dict[str, Any]]:
     """
     在给定的数据库连接上执行查询
     
@@ -313,6 +423,7 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
         params: 查询参数 (可选)
         batch_size: 批处理大小，控制每次从游标获取的记录数量 (仅当stream_results=True时有效)
         stream_results: 是否使用流式处理获取大型结果集
+        commit: 修改操作后是否立即提交 (在事务中执行时为False，由事务统一提交或回滚)
         
     Returns:
         查询结果列表，如果是修改操作则返回影响的行数
@@ -326,12 +437,21 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
     start_time = time.time()  # 记录查询开始时间
     
     try:
-        # 安全检查
+        # 安全检查（先于解析执行，超长或空SQL在长度检查处即被拒绝，不进入解析器和解析缓存）
         if not await sql_interceptor.check_operation(query):
             raise SecurityException("操作被安全机制拒绝")
+        
+        # 读取安全检查时已缓存的解析结果获取操作类型
+        parsed_sql = SQLParser.parse_query(query)
+        category = parsed_sql.category
+        operation = parsed_sql.operation_type
             
         # 创建异步游标，支持字典结果
-        cursor = await connection.cursor(aiomysql.DictCursor)
+        # 流式获取普通查询结果时使用服务端游标，避免驱动一次性缓冲整个结果集
+        if stream_results and category != 'METADATA' and operation not in _WRITE_OPS:
+            cursor = await _open_cursor(connection, SSDictCursor)
+        else:
+            cursor = await _open_cursor(connection, DictCursor)
         
         # 执行查询 - 异步执行
         if params:
@@ -344,16 +464,13 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
         else:
             await cursor.execute(query)
         
-        # 解析SQL语句获取操作类型
-        parsed_sql = SQLParser.parse_query(query)
-        operation = parsed_sql['operation_type']
-        
         # 对于修改操作，提交事务并返回影响的行数
-        if parsed_sql['category'] == 'DML' and operation in {'UPDATE', 'DELETE', 'INSERT'}:
+        if category == 'DML' and operation in _WRITE_OPS:
             affected_rows = cursor.rowcount
-            # 提交事务，确保更改被保存
-            await connection.commit()
-            logger.debug(f"修改操作 {operation} 影响了 {affected_rows} 行数据")
+            # 提交事务，确保更改被保存（事务中由事务上下文统一提交）
+            if commit:
+                await connection.commit()
+            logger.debug("修改操作 %s 影响了 %d 行数据", operation, affected_rows)
             
             # 记录查询执行时间
             execution_time = time.time() - start_time
@@ -362,13 +479,13 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
             return [{'affected_rows': affected_rows}]
         
         # 处理元数据查询操作
-        if parsed_sql['category'] == 'METADATA':
+        if category == 'METADATA':
             # 元数据查询通常结果较小，直接获取所有结果
             results = await cursor.fetchall()
             
             # 没有结果时返回空列表但添加元信息
             if not results:
-                logger.debug(f"元数据查询 {operation} 没有返回结果")
+                logger.debug("元数据查询 %s 没有返回结果", operation)
                 # 记录查询执行时间
                 execution_time = time.time() - start_time
                 _log_query_performance(query, execution_time, operation)
@@ -384,14 +501,14 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
                 if operation == 'SHOW' and 'Table' in row_dict:
                     # SHOW TABLES 结果增强
                     row_dict['table_name'] = row_dict['Table']
-                elif operation in {'DESC', 'DESCRIBE'} and 'Field' in row_dict:
+                elif operation in _DESCRIBE_OPS and 'Field' in row_dict:
                     # DESC/DESCRIBE 表结构结果增强
                     row_dict['column_name'] = row_dict['Field']
                     row_dict['data_type'] = row_dict['Type']
                 
                 metadata_results.append(row_dict)
                 
-            logger.debug(f"元数据查询 {operation} 返回 {len(metadata_results)} 条结果")
+            logger.debug("元数据查询 %s 返回 %d 条结果", operation, len(metadata_results))
             
             # 记录查询执行时间
             execution_time = time.time() - start_time
@@ -405,24 +522,29 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
             all_results = []
             total_fetched = 0
             
+            # 循环内频繁使用的方法预先绑定到局部变量
+            fetchmany = cursor.fetchmany
+            extend = all_results.extend
+            debug_enabled = logger.isEnabledFor(logging.DEBUG)
+            
             # 分批次获取结果
             while True:
-                batch = await cursor.fetchmany(batch_size)
+                batch = await fetchmany(batch_size)
                 if not batch:
                     break
                     
-                # 使用工具函数将DictRow对象转换为普通字典
-                dict_batch = normalize_result(batch)
-                all_results.extend(dict_batch)
+                # SSDictCursor返回的行已经是普通字典，直接追加
+                extend(batch)
                 
                 total_fetched += len(batch)
-                logger.debug(f"已获取 {total_fetched} 条记录")
+                if debug_enabled:
+                    logger.debug("已获取 %d 条记录", total_fetched)
                 
                 # 检查是否还有剩余结果
                 if len(batch) < batch_size:
                     break
                     
-            logger.debug(f"流式查询总共返回 {len(all_results)} 条结果")
+            logger.debug("流式查询总共返回 %d 条结果", len(all_results))
             
             # 记录查询执行时间
             execution_time = time.time() - start_time
@@ -433,10 +555,10 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
             # 传统方式 - 一次性获取所有结果
             results = await cursor.fetchall()
             
-            # 使用工具函数将DictRow对象转换为普通字典
-            dict_results = normalize_result(results)
+            # DictCursor返回的行已经是普通字典，无需逐行复制
+            dict_results = results or []
             
-            logger.debug(f"查询返回 {len(dict_results)} 条结果")
+            logger.debug("查询返回 %d 条结果", len(dict_results))
             
             # 记录查询执行时间
             execution_time = time.time() - start_time
@@ -448,8 +570,8 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
         logger.error(f"安全检查失败: {str(security_err)}")
         raise
     except aiomysql.Error as query_err:
-        # 如果发生错误，进行回滚
-        if parsed_sql and parsed_sql['operation_type'] in {'UPDATE', 'DELETE', 'INSERT'}:
+        # 如果发生错误，进行回滚（事务中由事务上下文统一回滚）
+        if commit and parsed_sql and parsed_sql.operation_type in _WRITE_OPS:
             try:
                 await connection.rollback()
                 logger.debug("事务已回滚")
@@ -463,6 +585,62 @@ async def execute_query(connection, query: str, params: Optional[Dict[str, Any]]
             await cursor.close()
             logger.debug("数据库游标已关闭")
 
+async def iter_query_rows(connection, query: str, 
+                          params: Optional[Dict[str, Any]] = None) -> AsyncGenerator[Dict[str, Any], None]:
+    """
+    使用服务端游标流式执行查询，逐行产出结果
+    
+    与execute_query(stream_results=True)不同，结果不会被收集到列表中，
+    适用于调用方边读取边处理的大型结果集，仅用于返回结果集的查询。
+    
+    用法示例:
+    async with get_db_connection() as conn:
+        async for row in iter_query_rows(conn, "SELECT * FROM big_table"):
+            ...
+    
+    Args:
+        connection: 数据库连接
+        query: SQL查询语句
+        params: 查询参数 (可选)
+        
+    Yields:
+        查询结果行字典
+        
+    Raises:
+        SecurityException: 当操作被安全机制拒绝时
+        ValueError: 当查询执行失败时
+    """
+    # 安全检查
+    if not await sql_interceptor.check_operation(query):
+        raise SecurityException("操作被安全机制拒绝")
+    
+    start_time = time.time()
+    cursor = await _open_cursor(connection, SSDictCursor)
+    try:
+        row_count = 0
+        try:
+            if params:
+                await cursor.execute(query, params)
+            else:
+                await cursor.execute(query)
+            
+            async for row in cursor:
+                row_count += 1
+                yield row
+        except aiomysql.Error as query_err:
+            logger.error(f"查询执行失败: {str(query_err)}")
+            raise ValueError(f"查询执行失败: {str(query_err)}")
+        
+        logger.debug("流式查询总共返回 %d 条结果", row_count)
+        
+        # 记录查询执行时间
+        execution_time = time.time() - start_time
+        _log_query_performance(query, execution_time, SQLParser.parse_query(query).operation_type)
+    finally:
+        # 确保游标正确关闭，未读取完的结果会在关闭时被丢弃
+        await cursor.close()
+        logger.debug("数据库游标已关闭")
+
 def _log_query_performance(query: str, execution_time: float, operation_type: str = ""):
     """
     记录查询性能日志
@@ -472,41 +650,112 @@ def _log_query_performance(query: str, execution_time: float, operation_type: st
         execution_time: 执行时间（秒）
         operation_type: 操作类型
     """
-    # 截断长查询以避免日志过大
-    truncated_query = query[:150] + '...' if len(query) > 150 else query
-    
     # 根据执行时间确定日志级别
     if execution_time >= 1.0:  # 超过1秒的查询记录为警告
-        logger.warning(f"慢查询 [{operation_type}]: {truncated_query} 执行时间: {execution_time:.4f}秒")
+        level, label = logging.WARNING, "慢查询"
     elif execution_time >= 0.5:  # 超过0.5秒的查询记录为提醒
-        logger.info(f"较慢查询 [{operation_type}]: {truncated_query} 执行时间: {execution_time:.4f}秒")
+        level, label = logging.INFO, "较慢查询"
     else:
-        logger.debug(f"查询 [{operation_type}] 执行时间: {execution_time:.4f}秒")
+        logger.debug("查询 [%s] 执行时间: %.4f秒", operation_type, execution_time)
+        return
+    
+    # 仅在日志实际输出时才截断长查询，避免常规路径上的字符串分配
+    if not logger.isEnabledFor(level):
+        return
+    truncated_query = query if len(query) <= 150 else query[:150] + '...'
+    logger.log(level, "%s [%s]: %s 执行时间: %.4f秒", label, operation_type, truncated_query, execution_time)
 
-async def execute_transaction_queries(connection, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+async def _execute_many(connection, query: str, params_list: List[Any]) -> List[List[Dict[str, Any]]]:
+    """
+    在同一游标上依次执行同一条写操作SQL（不提交事务，由调用方的事务负责）
+    
+    安全检查与解析只做一次；不使用executemany，因为其rowcount只有总影响行数，
+    无法按语句返回结果。
+    
+    Args:
+        connection: 数据库连接
+        query: SQL语句
+        params_list: 每次执行对应的参数列表
+        
+    Returns:
+        每组参数对应一个结果，与execute_query对写操作的返回格式相同
+        
+    Raises:
+        SecurityException: 当操作被安全机制拒绝时
+        ValueError: 当查询执行失败时
+    """
+    # 所有参数共用同一SQL文本，只需检查一次
+    if not await sql_interceptor.check_operation(query):
+        raise SecurityException("操作被安全机制拒绝")
+    
+    start_time = time.time()
+    cursor = await _open_cursor(connection)
+    try:
+        results = []
+        execute = cursor.execute
+        for params in params_list:
+            await execute(query, params)
+            results.append([{'affected_rows': cursor.rowcount}])
+        logger.debug("批量操作执行 %d 次", len(params_list))
+        
+        # 记录查询执行时间
+        execution_time = time.time() - start_time
+        _log_query_performance(query, execution_time, SQLParser.parse_query(query).operation_type)
+        
+        return results
+    except aiomysql.Error as query_err:
+        logger.error(f"批量查询执行失败: {str(query_err)}")
+        raise ValueError(f"查询执行失败: {str(query_err)}")
+    finally:
+        await cursor.close()
+
+async def execute_transaction_queries(connection, 
+                                      queries: List[Union[Dict[str, Any], Tuple[str, Any]]]) -> List[List[Dict[str, Any]]]:
     """
     在单个事务中执行多个查询
     
+    所有写操作在事务结束时一次提交，任一查询失败则整体回滚。当所有查询是同一条带参数的
+    写操作SQL（INSERT/UPDATE/DELETE）时，复用同一游标执行，安全检查与解析只做一次。
+    
     Args:
         connection: 数据库连接
-        queries: 查询列表，每个查询是一个包含 'query' 和可选 'params' 的字典
+        queries: 查询列表，每个查询是一个包含 'query' 和可选 'params' 的字典，
+                 或 (query, params) 元组
         
     Returns:
-        所有查询的结果列表
+        所有查询的结果列表，与输入的查询一一对应
         
     Raises:
+        SecurityException: 当任何查询被安全机制拒绝时（此时不会执行任何查询）
         Exception: 当任何查询执行失败时，整个事务将回滚
     """
+    items = [item if isinstance(item, tuple) else (item['query'], item.get('params'))
+             for item in queries]
     results = []
+    if not items:
+        return results
+    
+    # 开启事务前一次性检查所有语句，避免执行到中途才被拒绝
+    allowed = await sql_interceptor.check_operations([query for query, _ in items])
+    if not all(allowed):
+        raise SecurityException(f"第{allowed.index(False) + 1}条查询被安全机制拒绝，事务未执行")
+    
+    first_query = items[0][0]
+    is_batch = (
+        len(items) > 1
+        and all(query == first_query and params is not None for query, params in items)
+        and SQLParser.parse_query(first_query).operation_type in _WRITE_OPS
+    )
     
     async with transaction(connection):
-        for query_item in queries:
-            query = query_item['query']
-            params = query_item.get('params')
-            
-            # 执行单个查询
-            result = await execute_query(connection, query, params)
-            results.append(result)
+        if is_batch:
+            # 同一SQL批量执行，复用游标并跳过逐条的安全检查
+            results.extend(await _execute_many(connection, first_query, [params for _, params in items]))
+        else:
+            run_query = execute_query
+            for query, params in items:
+                # 执行单个查询，由事务统一提交
+                results.append(await run_query(connection, query, params, commit=False))
             
     return results
 
@@ -519,7 +768,7 @@ async def get_current_database() -> str:
     """
     async with get_db_connection(require_database=False) as connection:
         try:
-            cursor = await connection.cursor(aiomysql.DictCursor)
+            cursor = await _open_cursor(connection, DictCursor)
             await cursor.execute("SELECT DATABASE() as db")
             result = await cursor.fetchone()
             await cursor.close()
@@ -1,5 +1,7 @@
+import asyncio
+import functools
 import logging
-from typing import List, Dict
+from typing import Any, List, Dict, Tuple
 
 from ..config import SecurityConfig, SQLConfig
 from .sql_analyzer import SQLOperationType, SQLRiskLevel
@@ -7,6 +9,9 @@ from .sql_parser import SQLParser
 
 logger = logging.getLogger(__name__)
 
+# 超过该长度的SQL在线程池中完成解析和风险分析，避免阻塞事件循环；较短的SQL直接执行，省去线程切换开销
+_INLINE_CHECK_MAX_LENGTH = 500
+
 class SecurityException(Exception):
     """安全相关异常"""
     pass
@@ -18,6 +23,9 @@ class SQLInterceptor:
         self.analyzer = analyzer
         # 设置最大SQL长度限制
         self.max_sql_length = SecurityConfig.MAX_SQL_LENGTH
+        # 检查结论缓存 - 键为SQL，相同SQL重复执行时跳过解析和风险分析。
+        # 分析器的环境与风险等级配置在启动时确定，运行期间不变
+        self._decision_cache = functools.lru_cache(maxsize=2048)(self._check_operation_sync)
 
     async def check_operation(self, sql_query: str) -> bool:
         """
@@ -32,62 +40,116 @@ class SQLInterceptor:
         Raises:
             SecurityException: 当操作被拒绝时抛出
         """
+        # 先做O(1)的长度检查和不分配内存的空白检查，超长或空SQL不进入解析，也不占用缓存
+        sql_length = len(sql_query) if sql_query else 0
+        if sql_length > self.max_sql_length:
+            error_msg = f"SQL语句长度({sql_length})超出限制({self.max_sql_length})"
+            logger.error(error_msg)
+            raise SecurityException(error_msg)
+        if sql_length == 0 or sql_query.isspace():
+            logger.error("SQL语句不能为空")
+            raise SecurityException("SQL语句不能为空")
+        
+        try:
+            if sql_length > _INLINE_CHECK_MAX_LENGTH:
+                allowed, message = await asyncio.to_thread(self._decision_cache, sql_query)
+            else:
+                allowed, message = self._decision_cache(sql_query)
+        except Exception as e:
+            error_msg = f"安全检查失败: {str(e)}"
+            logger.error(error_msg)
+            raise SecurityException(error_msg)
+        
+        if not allowed:
+            logger.error(message)
+            raise SecurityException(message)
+        
+        # 通过时message为日志参数，INFO未启用时跳过表名拼接与格式化
+        if logger.isEnabledFor(logging.INFO):
+            operation_category, operation, risk_level_name, affected_tables = message
+            logger.info(
+                "SQL%s操作检查通过 - 操作: %s, 风险等级: %s, 影响表: %s",
+                operation_category, operation, risk_level_name, ', '.join(affected_tables)
+            )
+        return True
+
+    async def check_operations(self, sql_queries: List[str]) -> List[bool]:
+        """
+        批量检查多条SQL操作是否允许执行，用于脚本、事务等一次提交多条语句的场景
+        
+        规则与check_operation相同，但被拒绝的语句不抛出异常，只记录日志并在结果中标记为False，
+        调用方可在执行任何语句之前得知整批是否可执行。重复的SQL只检查一次。
+        
+        Args:
+            sql_queries: SQL查询语句列表
+            
+        Returns:
+            List[bool]: 与输入一一对应的是否允许执行
+        """
+        decisions: Dict[str, bool] = {}
+        results = []
+        for sql_query in sql_queries:
+            allowed = decisions.get(sql_query)
+            if allowed is None:
+                try:
+                    allowed = await self.check_operation(sql_query)
+                except SecurityException:
+                    allowed = False
+                decisions[sql_query] = allowed
+            results.append(allowed)
+        return results
+
+    def _check_operation_sync(self, sql_query: str) -> Tuple[bool, Any]:
+        """
+        执行SQL安全检查并返回结论（无日志副作用，结果可缓存）
+        
+        调用前check_operation已完成空SQL和长度检查。
+        
+        Args:
+            sql_query: SQL查询语句
+            
+        Returns:
+            Tuple[bool, Any]: (是否允许执行, 通过时为(操作类别, 操作, 风险等级名, 影响表)日志参数，拒绝时为原因)
+        """
         try:
-            # 检查SQL是否为空
-            if not sql_query or not sql_query.strip():
-                raise SecurityException("SQL语句不能为空")
-                
-            # 检查SQL长度
-            if len(sql_query) > self.max_sql_length:
-                raise SecurityException(f"SQL语句长度({len(sql_query)})超出限制({self.max_sql_length})")
-                
             # 使用SQLParser解析SQL
             parsed_sql = SQLParser.parse_query(sql_query)
             
             # 检查SQL是否有效
-            if not parsed_sql['is_valid']:
+            if not parsed_sql.is_valid:
                 raise SecurityException("SQL语句格式无效")
                 
-            operation = parsed_sql['operation_type']
-            # 更新支持的操作类型列表，包括元数据操作
-            supported_operations = SQLConfig.DDL_OPERATIONS | SQLConfig.DML_OPERATIONS | SQLConfig.METADATA_OPERATIONS
-                
-            if operation not in supported_operations:
+            operation = parsed_sql.operation_type
+            # 支持的操作类型，包括元数据操作
+            if operation not in SQLConfig.ALL_OPERATIONS:
                 raise SecurityException(f"不支持的SQL操作: {operation}")
             
-            # 分析SQL风险
-            risk_analysis = self.analyzer.analyze_risk(sql_query)
+            # 分析SQL风险，复用上面的解析结果
+            risk_analysis = self.analyzer.analyze_risk(sql_query, parsed_sql=parsed_sql)
             
             # 检查是否是危险操作
-            if risk_analysis['is_dangerous']:
+            if risk_analysis.is_dangerous:
                 raise SecurityException(
-                    f"检测到危险操作: {risk_analysis['operation']}"
+                    f"检测到危险操作: {risk_analysis.operation}"
                 )
             
             # 检查操作是否被允许
-            if not risk_analysis['is_allowed']:
+            if not risk_analysis.is_allowed:
                 raise SecurityException(
-                    f"当前操作风险等级({risk_analysis['risk_level'].name})不被允许执行，"
-                    f"允许的风险等级: {[level.name for level in self.analyzer.allowed_risk_levels]}"
+                    f"当前操作风险等级({risk_analysis.risk_level.name})不被允许执行，"
+                    f"允许的风险等级: {self.analyzer.allowed_risk_levels_repr}"
                 )
             
             # 确定操作类型（DDL, DML 或 元数据）
-            operation_category = parsed_sql['category']
+            operation_category = parsed_sql.category
             
-            # 记录详细日志
-            logger.info(
-                f"SQL{operation_category}操作检查通过 - "
-                f"操作: {risk_analysis['operation']}, "
-                f"风险等级: {risk_analysis['risk_level'].name}, "
-                f"影响表: {', '.join(risk_analysis['affected_tables'])}"
+            # 详细日志参数，由check_operation按日志级别决定是否格式化
+            return True, (
+                operation_category,
+                risk_analysis.operation,
+                risk_analysis.risk_level.name,
+                risk_analysis.affected_tables
             )
 
-            return True
-
         except SecurityException as e:
-            logger.error(str(e))
-            raise
-        except Exception as e:
-            error_msg = f"安全检查失败: {str(e)}"
-            logger.error(error_msg)
-            raise SecurityException(error_msg) 
\ No newline at end of file
+            return False, str(e)
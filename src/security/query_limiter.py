@@ -28,10 +28,10 @@ class QueryLimiter:
             
         # 使用SQLParser解析SQL
         parsed_sql = SQLParser.parse_query(sql_query)
-        operation_type = parsed_sql['operation_type']
+        operation_type = parsed_sql.operation_type
         
         # 检查是否为无 WHERE 子句的更新/删除操作
-        if operation_type in {'UPDATE', 'DELETE'} and not parsed_sql['has_where']:
+        if operation_type in {'UPDATE', 'DELETE'} and not parsed_sql.has_where:
             error_msg = f"{operation_type}操作必须包含WHERE子句"
             logger.warning(f"查询被限制: {error_msg}")
             return False, error_msg
@@ -1,81 +1,137 @@
-import re
 import logging
-from typing import List, Set
+from typing import List, NamedTuple, Optional, Set, Tuple
 
 from ..config import SQLRiskLevel, EnvironmentType, SecurityConfig, SQLConfig
-from .sql_parser import SQLParser
+from .sql_parser import ParsedSQL, SQLParser
 
 logger = logging.getLogger(__name__)
 
+# hyperscan为可选依赖：已安装时阻止模式编译为DFA数据库，单次线性扫描且无回溯
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+class ImpactResult(NamedTuple):
+    """查询影响范围估算结果"""
+    operation: str
+    estimated_rows: float
+    needs_where: bool
+    has_where: bool
+
+class RiskResult(NamedTuple):
+    """SQL风险分析结果"""
+    operation: str
+    operation_type: str
+    is_dangerous: bool
+    affected_tables: Tuple[str, ...]
+    risk_level: SQLRiskLevel
+    is_allowed: bool
+    estimated_impact: ImpactResult
+
+# 空SQL的分析结果
+_EMPTY_RISK_RESULT = RiskResult(
+    operation='',
+    operation_type='UNKNOWN',
+    is_dangerous=True,
+    affected_tables=(),
+    risk_level=SQLRiskLevel.HIGH,
+    is_allowed=False,
+    estimated_impact=ImpactResult(operation='', estimated_rows=0, needs_where=False, has_where=False)
+)
+
+# 单语句操作的基础风险等级，SELECT及依赖WHERE子句的UPDATE/DELETE单独处理
+_BASE_RISK = {
+    **{op: SQLRiskLevel.LOW for op in SQLConfig.METADATA_OPERATIONS},  # 元数据查询视为低风险操作
+    **{op: SQLRiskLevel.HIGH for op in SQLConfig.DDL_OPERATIONS},
+    'DROP': SQLRiskLevel.CRITICAL,
+    'TRUNCATE': SQLRiskLevel.CRITICAL,
+    'INSERT': SQLRiskLevel.MEDIUM,
+}
+
+# 依赖WHERE子句的操作风险等级：(无WHERE, 有WHERE)，无WHERE条件的DELETE操作视为CRITICAL风险
+_WHERE_RISK = {
+    'UPDATE': (SQLRiskLevel.HIGH, SQLRiskLevel.MEDIUM),
+    'DELETE': (SQLRiskLevel.CRITICAL, SQLRiskLevel.MEDIUM),
+}
+
+# 只读操作（SELECT及元数据查询），满足条件时可跳过危险模式检查
+_SAFE_OPS_NO_SCAN = frozenset({'SELECT'}) | SQLConfig.METADATA_OPERATIONS
+
 class SQLOperationType:
     """SQL操作类型分析器"""
     
+    __slots__ = ('env_type', 'allowed_risk_levels', 'allowed_risk_levels_repr', '_allowed_mask', 'blocked_patterns', '_blocked_re', '_hs_db')
+    
+    # 操作类型集合从配置读取（frozenset），所有实例共享
+    ddl_operations = SQLConfig.DDL_OPERATIONS
+    dml_operations = SQLConfig.DML_OPERATIONS
+    metadata_operations = SQLConfig.METADATA_OPERATIONS
+    
     def __init__(self):
         # 环境类型从配置读取
         self.env_type = SecurityConfig.ENV_TYPE
         
-        # 操作类型集合从配置读取
-        self.ddl_operations = SQLConfig.DDL_OPERATIONS
-        self.dml_operations = SQLConfig.DML_OPERATIONS
-        self.metadata_operations = SQLConfig.METADATA_OPERATIONS
-        
         # 风险等级配置从配置读取
         self.allowed_risk_levels = SecurityConfig.ALLOWED_RISK_LEVELS
+        # 允许的风险等级位掩码（第int(level)位），每次查询用一次位与代替集合查找；集合仅用于日志展示
+        self._allowed_mask = 0
+        for level in self.allowed_risk_levels:
+            self._allowed_mask |= 1 << int(level)
+        # 允许的风险等级展示文本，用于日志和拒绝信息
+        self.allowed_risk_levels_repr = ', '.join(level.name for level in sorted(self.allowed_risk_levels, key=int))
         self.blocked_patterns = SecurityConfig.BLOCKED_PATTERNS
+        # 所有阻止模式合并后的预编译正则（忽略大小写），未配置模式时为None
+        self._blocked_re = SecurityConfig.BLOCKED_PATTERN_RE
+        # hyperscan数据库，未安装hyperscan或模式无法编译时为None，此时使用上面的正则
+        self._hs_db = self._build_hyperscan_db(self.blocked_patterns)
         
         logger.info(f"SQL分析器初始化 - 环境: {self.env_type.value}")
-        logger.info(f"允许的风险等级: {[level.name for level in self.allowed_risk_levels]}")
+        logger.info(f"允许的风险等级: {self.allowed_risk_levels_repr}")
 
-    def analyze_risk(self, sql_query: str) -> dict:
+    def analyze_risk(self, sql_query: str, parsed_sql: Optional[ParsedSQL] = None) -> RiskResult:
         """
         分析SQL查询的风险级别和影响范围
         
         Args:
             sql_query: SQL查询语句
+            parsed_sql: 调用方已得到的SQLParser解析结果，为None时在此解析
             
         Returns:
-            dict: 包含风险分析结果的字典
+            RiskResult: 风险分析结果
         """
         sql_query = sql_query.strip()
         
         # 处理空SQL
         if not sql_query:
-            return {
-                'operation': '',
-                'operation_type': 'UNKNOWN',
-                'is_dangerous': True,
-                'affected_tables': [],
-                'estimated_impact': {
-                    'operation': '',
-                    'estimated_rows': 0,
-                    'needs_where': False,
-                    'has_where': False
-                },
-                'risk_level': SQLRiskLevel.HIGH,
-                'is_allowed': False
-            }
+            return _EMPTY_RISK_RESULT
             
-        # 使用SQLParser解析SQL
-        parsed_sql = SQLParser.parse_query(sql_query)
-        operation = parsed_sql['operation_type']
-        
-        # 基本风险分析
-        risk_analysis = {
-            'operation': operation,
-            'operation_type': parsed_sql['category'],
-            'is_dangerous': self._check_dangerous_patterns(sql_query),
-            'affected_tables': parsed_sql['tables'],
-            'estimated_impact': self._estimate_impact(sql_query, parsed_sql)
-        }
+        # 使用SQLParser解析SQL，解析结果在各项检查间共享，避免重复解析
+        if parsed_sql is None:
+            parsed_sql = SQLParser.parse_query(sql_query)
+        operation = parsed_sql.operation_type
+        
+        # 快速路径：未配置阻止模式时，单语句的只读操作不可能被判定为危险，跳过危险模式检查
+        if (self._blocked_re is None and operation in _SAFE_OPS_NO_SCAN
+                and not parsed_sql.multi_statement):
+            is_dangerous = False
+        else:
+            is_dangerous = self._check_dangerous_patterns(sql_query, parsed_sql)
         
         # 计算风险等级
-        risk_level = self._calculate_risk_level(sql_query, operation, risk_analysis['is_dangerous'], parsed_sql['has_where'])
-        risk_analysis['risk_level'] = risk_level
-        risk_analysis['is_allowed'] = risk_level in self.allowed_risk_levels
+        risk_level = self._calculate_risk_level(sql_query, operation, is_dangerous, parsed_sql.has_where, parsed_sql)
         
-        return risk_analysis
+        return RiskResult(
+            operation=operation,
+            operation_type=parsed_sql.category,
+            is_dangerous=is_dangerous,
+            affected_tables=parsed_sql.tables,
+            risk_level=risk_level,
+            is_allowed=bool(self._allowed_mask & (1 << int(risk_level))),
+            estimated_impact=self._estimate_impact(sql_query, parsed_sql)
+        )
 
-    def _calculate_risk_level(self, sql_query: str, operation: str, is_dangerous: bool, has_where: bool) -> SQLRiskLevel:
+    def _calculate_risk_level(self, sql_query: str, operation: str, is_dangerous: bool, has_where: bool, parsed_sql: ParsedSQL) -> SQLRiskLevel:
         """
         计算操作风险等级
         
@@ -95,9 +151,6 @@ class SQLOperationType:
            - SHOW/DESC/DESCRIBE等 => LOW
         6. 多语句SQL通常被认为是高风险的
         """
-        # 解析SQL获取额外信息
-        parsed_sql = SQLParser.parse_query(sql_query)
-        
         # 危险操作
         if is_dangerous:
             return SQLRiskLevel.CRITICAL
@@ -105,69 +158,91 @@ class SQLOperationType:
         # 生产环境特别规则
         if self.env_type == EnvironmentType.PRODUCTION:
             # 生产环境中只允许SELECT和元数据操作
-            if operation != 'SELECT' and parsed_sql['category'] != 'METADATA':
+            if operation != 'SELECT' and parsed_sql.category != 'METADATA':
                 return SQLRiskLevel.CRITICAL
             
             # 生产环境中的多语句SQL视为高风险
-            if parsed_sql.get('multi_statement', False):
+            if parsed_sql.multi_statement:
                 return SQLRiskLevel.HIGH
             
         # 多语句SQL在任何环境中都是更高风险的
-        if parsed_sql.get('multi_statement', False):
+        if parsed_sql.multi_statement:
             # 至少中等风险，如果包含DDL则为高风险或严重风险
-            if parsed_sql['category'] == 'DDL':
+            if parsed_sql.category == 'DDL':
                 return SQLRiskLevel.HIGH
-            elif parsed_sql['category'] == 'DML' and operation not in {'SELECT'}:
+            elif parsed_sql.category == 'DML' and operation not in {'SELECT'}:
                 return SQLRiskLevel.HIGH
             return SQLRiskLevel.MEDIUM
             
-        # 元数据操作
-        if operation in self.metadata_operations:
-            return SQLRiskLevel.LOW  # 元数据查询视为低风险操作
-            
-        # DDL操作
-        if operation in self.ddl_operations:
-            if operation in {'DROP', 'TRUNCATE'}:
-                return SQLRiskLevel.CRITICAL
-            return SQLRiskLevel.HIGH
+        # 元数据、DDL及INSERT操作查表得到固定等级
+        risk_level = _BASE_RISK.get(operation)
+        if risk_level is not None:
+            return risk_level
             
         # DML操作
         if operation == 'SELECT':
             # 对于不带LIMIT的大型SELECT, 风险可能提高
-            if not parsed_sql['has_limit'] and self.env_type == EnvironmentType.PRODUCTION:
+            if not parsed_sql.has_limit and self.env_type == EnvironmentType.PRODUCTION:
                 return SQLRiskLevel.MEDIUM
             return SQLRiskLevel.LOW
-        elif operation == 'INSERT':
-            return SQLRiskLevel.MEDIUM
-        elif operation == 'UPDATE':
-            return SQLRiskLevel.HIGH if not has_where else SQLRiskLevel.MEDIUM
-        elif operation == 'DELETE':
-            # 无WHERE条件的DELETE操作视为CRITICAL风险
-            return SQLRiskLevel.CRITICAL if not has_where else SQLRiskLevel.MEDIUM
+        
+        where_risk = _WHERE_RISK.get(operation)
+        if where_risk is not None:
+            return where_risk[has_where]
             
         # 默认情况
         return SQLRiskLevel.HIGH
 
-    def _check_dangerous_patterns(self, sql_query: str) -> bool:
+    def _check_dangerous_patterns(self, sql_query: str, parsed_sql: ParsedSQL) -> bool:
         """检查是否匹配危险操作模式"""
-        sql_upper = sql_query.upper()
-        
-        # 解析SQL以获取更多信息
-        parsed_sql = SQLParser.parse_query(sql_query)
-        
         # 检查是否为多语句SQL - 大多数情况下使用多语句SQL可能是危险的
-        if parsed_sql.get('multi_statement', False) and self.env_type == EnvironmentType.PRODUCTION:
+        if parsed_sql.multi_statement and self.env_type == EnvironmentType.PRODUCTION:
             # 生产环境中的多语句SQL视为危险
             return True
         
-        # 对敏感关键字的检查
-        for pattern in self.blocked_patterns:
-            if re.search(pattern, sql_upper, re.IGNORECASE):
-                return True
+        # 对敏感关键字的检查 - 优先使用hyperscan数据库
+        if self._hs_db is not None:
+            matched = []
+            self._hs_db.scan(sql_query.encode('utf-8'), match_event_handler=self._on_hs_match, context=matched)
+            return bool(matched)
+        
+        # 所有模式已合并为一个忽略大小写的正则，单次扫描，无需先转大写
+        if self._blocked_re is not None and self._blocked_re.search(sql_query) is not None:
+            return True
                 
         return False
 
-    def _estimate_impact(self, sql_query: str, parsed_sql: dict) -> dict:
+    @staticmethod
+    def _on_hs_match(pattern_id, start, end, flags, context):
+        """hyperscan匹配回调，记录命中的模式"""
+        context.append(pattern_id)
+
+    @staticmethod
+    def _build_hyperscan_db(patterns):
+        """
+        将阻止模式编译为hyperscan数据库
+        
+        hyperscan不支持反向引用、环视等部分正则语法，任一模式编译失败时返回None，
+        由调用方回退到预编译的正则。
+        """
+        if hyperscan is None or not patterns:
+            return None
+        
+        try:
+            db = hyperscan.Database()
+            db.compile(
+                expressions=[pattern.encode('utf-8') for pattern in patterns],
+                ids=list(range(len(patterns))),
+                flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns),
+            )
+        except Exception as e:
+            logger.warning(f"阻止模式无法编译为hyperscan数据库，使用正则匹配: {e}")
+            return None
+        
+        logger.info(f"阻止模式已编译为hyperscan数据库，共{len(patterns)}个模式")
+        return db
+
+    def _estimate_impact(self, sql_query: str, parsed_sql: ParsedSQL) -> ImpactResult:
         """
         估算查询影响范围
         
@@ -176,27 +251,27 @@ class SQLOperationType:
             parsed_sql: 解析后的SQL信息
             
         Returns:
-            dict: 包含预估影响的字典
+            ImpactResult: 预估影响
         """
-        operation = parsed_sql['operation_type']
-        
-        impact = {
-            'operation': operation,
-            'estimated_rows': 0,
-            'needs_where': operation in {'UPDATE', 'DELETE'},
-            'has_where': parsed_sql['has_where']
-        }
+        operation = parsed_sql.operation_type
+        has_where = parsed_sql.has_where
+        estimated_rows = 0
         
         # 根据环境类型调整估算
         if self.env_type == EnvironmentType.PRODUCTION:
             if operation == 'SELECT':
-                impact['estimated_rows'] = 100
+                estimated_rows = 100
             else:
-                impact['estimated_rows'] = float('inf')  # 生产环境中非SELECT操作视为影响无限行
+                estimated_rows = float('inf')  # 生产环境中非SELECT操作视为影响无限行
         else:
             if operation == 'SELECT':
-                impact['estimated_rows'] = 100
+                estimated_rows = 100
             elif operation in {'UPDATE', 'DELETE'}:
-                impact['estimated_rows'] = 1000 if impact['has_where'] else float('inf')
+                estimated_rows = 1000 if has_where else float('inf')
         
-        return impact 
\ No newline at end of file
+        return ImpactResult(
+            operation=operation,
+            estimated_rows=estimated_rows,
+            needs_where=operation in {'UPDATE', 'DELETE'},
+            has_where=has_where
+        )
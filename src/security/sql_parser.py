@@ -1,28 +1,156 @@
 import sqlparse
 import re
 import logging
-from typing import List, Set, Tuple, Optional, Dict
+import functools
+from typing import List, NamedTuple, Set, Tuple, Optional, Dict
 
 from ..config import SQLConfig
 
 logger = logging.getLogger(__name__)
 
+# 回退解析使用的子句检测，按完整单词匹配，避免命中NOWHERE、where_flag等标识符
+_WHERE_RE = re.compile(r'\bWHERE\b', re.IGNORECASE)
+_LIMIT_RE = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+# 回退解析：首个单词、紧跟在FROM/JOIN/UPDATE/INTO/TABLE之后的表名，以及不应视为表名的关键字
+_FIRST_WORD_RE = re.compile(r'\s*(\w+)')
+_TABLE_KW_RE = re.compile(r'\b(?:FROM|JOIN|UPDATE|INTO|TABLE)\s+([`\w$.]+)', re.IGNORECASE)
+_NON_TABLE_WORDS = frozenset({'SELECT', 'WHERE', 'SET'})
+
+# 常用token类型及语法节点类型，绑定为模块常量避免逐token的属性查找
+_T_KEYWORD = sqlparse.tokens.Keyword
+_T_DML = sqlparse.tokens.Keyword.DML
+_T_DDL = sqlparse.tokens.Keyword.DDL
+_T_ORDER = sqlparse.tokens.Keyword.Order
+_T_NAME = sqlparse.tokens.Name
+_T_PUNCT = sqlparse.tokens.Punctuation
+# 语句开头的DESC被sqlparse识别为排序关键字（Keyword.Order），同样视为操作类型
+_OPERATION_TTYPES = (_T_DML, _T_DDL, _T_KEYWORD, _T_ORDER)
+_Where = sqlparse.sql.Where
+
+# 操作类型到类别（DDL、DML或元数据）的映射
+_OPERATION_CATEGORIES = {
+    **{op: 'METADATA' for op in SQLConfig.METADATA_OPERATIONS},
+    **{op: 'DML' for op in SQLConfig.DML_OPERATIONS},
+    **{op: 'DDL' for op in SQLConfig.DDL_OPERATIONS},
+}
+
+# 表名提取的扫描状态
+_STATE_DEFAULT, _STATE_EXPECT_NAME, _STATE_AFTER_NAME, _STATE_QUALIFIED = range(4)
+# 各操作类型的表名触发关键字，以及是否只收集第一个触发关键字后的表名
+_DEFAULT_TABLE_TRIGGERS = (frozenset({'FROM', 'JOIN'}), False)
+_TABLE_TRIGGERS = {
+    'UPDATE': (frozenset({'UPDATE'}), True),
+    'INSERT': (frozenset({'INTO'}), True),
+    'DELETE': (frozenset({'FROM'}), True),
+    **{op: (frozenset({'TABLE'}), True) for op in ('CREATE', 'ALTER', 'DROP', 'TRUNCATE')},
+}
+# 触发关键字与表名之间可能出现的修饰关键字
+_TABLE_PREFIX_WORDS = frozenset({'IF EXISTS', 'IF NOT EXISTS', 'IGNORE', 'LOW_PRIORITY', 'QUICK', 'LATERAL', 'ONLY'})
+
+# 快速解析路径支持的操作，单条简单的查询/元数据语句占绝大多数流量
+_FAST_OPS = frozenset({'SELECT', 'SHOW', 'DESC', 'DESCRIBE'})
+# 出现这些内容时可能含注释、字符串字面量、反引号标识符或多条语句，交给完整解析
+_FAST_REJECT_RE = re.compile(r"""['"`#;]|--|/\*""")
+_SELECT_WORD_RE = re.compile(r'\bSELECT\b', re.IGNORECASE)
+_FAST_TABLE_RE = re.compile(r'\b(?:FROM|JOIN)\s+([^\s,()]+)', re.IGNORECASE)
+# FROM之后出现逗号或括号（逗号分隔的表列表、括号内的连接）或使用STRAIGHT_JOIN时，
+# 只取FROM/JOIN后第一个名称会漏掉表，交给完整解析
+_FAST_MULTI_TABLE_RE = re.compile(r'\bFROM\b.*[,(]|\bSTRAIGHT_JOIN\b', re.IGNORECASE | re.DOTALL)
+
+class ParsedSQL(NamedTuple):
+    """SQL解析结果（不可变，缓存命中时直接复用同一对象）"""
+    operation_type: str
+    tables: Tuple[str, ...]
+    has_where: bool
+    has_limit: bool
+    is_valid: bool
+    normalized_query: str
+    category: str
+    multi_statement: bool = False
+    statement_count: int = 1
+
 class SQLParser:
     """
     SQL解析器 - 使用sqlparse库提供更精确的SQL解析功能
     """
     
     @staticmethod
-    def parse_query(sql_query: str) -> Dict:
+    @functools.lru_cache(maxsize=1024)
+    def parse_query(sql_query: str) -> ParsedSQL:
         """
         解析SQL查询，返回解析结果
         
+        解析结果按原始SQL字符串缓存，重复执行的相同查询直接命中缓存，
+        命中情况可通过SQLParser.parse_query.cache_info()查看，cache_clear()清空。
+        由于结果在调用方之间共享，返回不可变的ParsedSQL，其中的表名为元组。
+        
+        Args:
+            sql_query: SQL查询语句
+            
+        Returns:
+            ParsedSQL: 解析结果
+        """
+        result = SQLParser._parse_query(sql_query)
+        result['tables'] = tuple(result['tables'])
+        return ParsedSQL(**result)
+    
+    @staticmethod
+    def try_parse_fast(sql_query: str) -> Optional[Dict]:
+        """
+        简单语句的快速解析，跳过sqlparse的格式化与完整语法分析
+        
+        仅处理不含注释、字符串字面量、反引号标识符、子查询和逗号分隔表列表的单条SELECT/SHOW/DESC语句，
+        结果字段与完整解析一致；不满足条件时返回None，由调用方使用完整解析。
+        
         Args:
             sql_query: SQL查询语句
             
         Returns:
-            Dict: 包含解析结果的字典
+            Optional[Dict]: 解析结果，无法快速解析时为None
         """
+        sql = sql_query.strip()
+        if sql.endswith(';'):
+            sql = sql[:-1]
+        if not sql or _FAST_REJECT_RE.search(sql) is not None:
+            return None
+        
+        head = sql[:9].split(None, 1)[0].upper()
+        if head not in _FAST_OPS:
+            return None
+        
+        # SELECT只允许出现一次（语句本身），出现子查询或UNION时交给完整解析
+        if len(_SELECT_WORD_RE.findall(sql)) != (1 if head == 'SELECT' else 0):
+            return None
+        
+        if _FAST_MULTI_TABLE_RE.search(sql) is not None:
+            return None
+        
+        # 按出现顺序去重
+        tables = dict.fromkeys(
+            name.rsplit('.', 1)[-1]
+            for name in _FAST_TABLE_RE.findall(sql)
+        )
+        
+        return {
+            'operation_type': head,
+            'tables': list(tables),
+            'has_where': _WHERE_RE.search(sql) is not None,
+            'has_limit': _LIMIT_RE.search(sql) is not None,
+            'is_valid': True,
+            'normalized_query': sql,
+            'category': SQLParser._get_operation_category(head),
+            'multi_statement': False,
+            'statement_count': 1
+        }
+    
+    @staticmethod
+    def _parse_query(sql_query: str) -> Dict:
+        """解析SQL查询的实际实现（不带缓存）"""
+        # 简单语句走快速路径
+        fast_result = SQLParser.try_parse_fast(sql_query)
+        if fast_result is not None:
+            return fast_result
+        
         if not sql_query or not sql_query.strip():
             return {
                 'operation_type': '',
@@ -38,13 +166,13 @@ class SQLParser:
             
         try:
             # 标准化和格式化SQL
-            formatted_sql = SQLParser._format_sql(sql_query)
+            formatted_sql = SQLParser._normalize_for_parse(sql_query)
             # 解析SQL语句 - 可能有多个语句
             parsed = sqlparse.parse(formatted_sql)
             
             # 检查是否有多个语句
-            is_multi_statement = len(parsed) > 1
             statement_count = len(parsed)
+            is_multi_statement = statement_count > 1
             
             if not parsed:
                 return {
@@ -59,64 +187,66 @@ class SQLParser:
                     'statement_count': 0
                 }
             
-            # 默认分析第一个语句，但记录多语句信息
-            stmt = parsed[0]
-            
-            # 获取操作类型
-            operation_type = SQLParser._get_operation_type(stmt)
-            
-            # 确定操作类别
-            category = SQLParser._get_operation_category(operation_type)
+            # 单条语句（最常见的情况）直接返回，跳过多语句的汇总与风险合并
+            if not is_multi_statement:
+                operation_type, tables, has_where, has_limit = SQLParser._analyze(parsed[0])
+                return {
+                    'operation_type': operation_type,
+                    'tables': tables,
+                    'has_where': has_where,
+                    'has_limit': has_limit,
+                    'is_valid': True,
+                    'normalized_query': formatted_sql,
+                    'category': SQLParser._get_operation_category(operation_type),
+                    'multi_statement': False,
+                    'statement_count': 1
+                }
             
-            # 提取表名 - 汇总所有语句中的表名
-            tables = set()
+            # 每个语句只遍历一次，同时得到操作类型、表名及WHERE/LIMIT子句信息，汇总所有语句
+            operations = []
+            tables = {}  # 按出现顺序去重
             has_where = False
             has_limit = False
             
             for statement in parsed:
-                # 将各语句涉及的表合并
-                tables.update(SQLParser._extract_tables(statement))
-                
-                # 检查任一语句是否有WHERE子句
-                if SQLParser._has_where_clause(statement):
-                    has_where = True
-                
-                # 检查任一语句是否有LIMIT子句
-                if SQLParser._has_limit_clause(statement):
-                    has_limit = True
+                op, stmt_tables, stmt_has_where, stmt_has_limit = SQLParser._analyze(statement)
+                operations.append(op)
+                tables.update(dict.fromkeys(stmt_tables))
+                has_where = has_where or stmt_has_where
+                has_limit = has_limit or stmt_has_limit
+            
+            # 默认使用第一个语句的操作类型，但记录多语句信息
+            operation_type = operations[0]
+            
+            # 确定操作类别
+            category = SQLParser._get_operation_category(operation_type)
             
             # 对于多语句，获取最高风险的操作类型
-            if is_multi_statement and len(parsed) > 1:
-                operations = []
-                categories = []
-                for statement in parsed:
-                    op = SQLParser._get_operation_type(statement)
-                    operations.append(op)
-                    categories.append(SQLParser._get_operation_category(op))
-                
-                # 风险优先级: DDL > DML > METADATA
-                if 'DDL' in categories:
-                    category = 'DDL'
-                    # 在DDL操作中找出优先级最高的
-                    # DROP/TRUNCATE > ALTER > CREATE
-                    if 'DROP' in operations or 'TRUNCATE' in operations:
-                        operation_type = 'DROP' if 'DROP' in operations else 'TRUNCATE'
-                    elif 'ALTER' in operations:
-                        operation_type = 'ALTER'
-                    elif 'CREATE' in operations:
-                        operation_type = 'CREATE'
-                elif 'DML' in categories:
-                    category = 'DML'
-                    # 在DML操作中找出优先级最高的 
-                    # DELETE > UPDATE > INSERT > SELECT
-                    if 'DELETE' in operations:
-                        operation_type = 'DELETE'
-                    elif 'UPDATE' in operations:
-                        operation_type = 'UPDATE'
-                    elif 'INSERT' in operations:
-                        operation_type = 'INSERT'
-                    elif 'SELECT' in operations:
-                        operation_type = 'SELECT'
+            categories = [SQLParser._get_operation_category(op) for op in operations]
+            
+            # 风险优先级: DDL > DML > METADATA
+            if 'DDL' in categories:
+                category = 'DDL'
+                # 在DDL操作中找出优先级最高的
+                # DROP/TRUNCATE > ALTER > CREATE
+                if 'DROP' in operations or 'TRUNCATE' in operations:
+                    operation_type = 'DROP' if 'DROP' in operations else 'TRUNCATE'
+                elif 'ALTER' in operations:
+                    operation_type = 'ALTER'
+                elif 'CREATE' in operations:
+                    operation_type = 'CREATE'
+            elif 'DML' in categories:
+                category = 'DML'
+                # 在DML操作中找出优先级最高的 
+                # DELETE > UPDATE > INSERT > SELECT
+                if 'DELETE' in operations:
+                    operation_type = 'DELETE'
+                elif 'UPDATE' in operations:
+                    operation_type = 'UPDATE'
+                elif 'INSERT' in operations:
+                    operation_type = 'INSERT'
+                elif 'SELECT' in operations:
+                    operation_type = 'SELECT'
             
             return {
                 'operation_type': operation_type,
@@ -126,7 +256,7 @@ class SQLParser:
                 'is_valid': True,
                 'normalized_query': formatted_sql,
                 'category': category,
-                'multi_statement': is_multi_statement,
+                'multi_statement': True,
                 'statement_count': statement_count
             }
             
@@ -134,32 +264,48 @@ class SQLParser:
             logger.error(f"SQL解析错误: {str(e)}")
             # 回退到简单的字符串解析
             result = SQLParser._fallback_parse(sql_query)
-            # 添加多语句检测，简单检测分号
-            result['multi_statement'] = ';' in sql_query.strip()
-            result['statement_count'] = sql_query.count(';') + 1 if sql_query.strip() else 0
+            # 添加多语句检测，简单检测分号，末尾的分号不算作语句分隔符
+            body = sql_query.rstrip().rstrip(';')
+            separators = body.count(';')
+            result['multi_statement'] = separators > 0
+            result['statement_count'] = separators + 1 if body and not body.isspace() else 0
             return result
     
     @staticmethod
-    def _format_sql(sql_query: str) -> str:
-        """标准化SQL查询格式"""
-        # 去除多余空白和注释
+    def _normalize_for_parse(sql_query: str) -> str:
+        """
+        标准化SQL以供解析：去除注释并将关键字转为大写
+        
+        不做重新缩进（reindent需要额外一轮分组与重排，只影响展示），
+        解析结果中的normalized_query即为该输出。
+        """
         return sqlparse.format(
-            sql_query,
+            sql_query.strip(),
             strip_comments=True,
-            reindent=True, 
             keyword_case='upper'
         )
     
+    @staticmethod
+    def _analyze(stmt: sqlparse.sql.Statement) -> Tuple[str, List[str], bool, bool]:
+        """
+        获取语句的操作类型、WHERE/LIMIT子句信息及表名
+        
+        Returns:
+            Tuple[str, List[str], bool, bool]: (操作类型, 表名列表, 是否有WHERE, 是否有LIMIT)
+        """
+        operation_type = SQLParser._get_operation_type(stmt)
+        has_where = any(isinstance(token, _Where) for token in stmt.tokens)
+        has_limit = SQLParser.has_limit_clause(stmt)
+        tables = SQLParser._extract_tables(stmt, operation_type)
+        return operation_type, tables, has_where, has_limit
+    
     @staticmethod
     def _get_operation_type(stmt: sqlparse.sql.Statement) -> str:
         """获取SQL操作类型"""
-        # 获取第一个token
-        if stmt.tokens and stmt.tokens[0].ttype is sqlparse.tokens.DML:
-            return stmt.tokens[0].value.upper()
-        elif stmt.tokens and stmt.tokens[0].ttype is sqlparse.tokens.DDL:
-            return stmt.tokens[0].value.upper()
-        elif stmt.tokens and stmt.tokens[0].ttype is sqlparse.tokens.Keyword:
-            return stmt.tokens[0].value.upper()
+        # 获取第一个有效token（跳过多语句拆分后残留的前导空白和注释），DML/DDL/普通关键字均视为操作类型
+        first_token = stmt.token_first(skip_cm=True)
+        if first_token is not None and first_token.ttype in _OPERATION_TTYPES:
+            return first_token.value.upper()
         
         # 如果无法确定，返回空字符串
         return ""
@@ -167,189 +313,111 @@ class SQLParser:
     @staticmethod
     def _get_operation_category(operation_type: str) -> str:
         """确定操作类别（DDL、DML或元数据）"""
-        if operation_type in SQLConfig.DDL_OPERATIONS:
-            return 'DDL'
-        elif operation_type in SQLConfig.DML_OPERATIONS:
-            return 'DML'
-        elif operation_type in SQLConfig.METADATA_OPERATIONS:
-            return 'METADATA'
-        else:
-            return 'UNKNOWN'
+        return _OPERATION_CATEGORIES.get(operation_type, 'UNKNOWN')
     
     @staticmethod
-    def _extract_tables(stmt: sqlparse.sql.Statement) -> List[str]:
-        """从SQL语句中提取所有表名"""
-        tables = []
+    def _extract_tables(stmt: sqlparse.sql.Statement, operation_type: Optional[str] = None) -> List[str]:
+        """
+        从SQL语句中提取所有表名
         
-        # 根据操作类型处理表名提取
-        operation_type = SQLParser._get_operation_type(stmt)
+        对展开后的token流做单次线性扫描：遇到触发关键字后收集紧随其后的表名，
+        逗号分隔的表名列表逐个收集，别名被忽略，子查询中的FROM/JOIN自然被扫描到。
+        UPDATE/INSERT/DELETE/DDL语句只收集第一个触发关键字后的表名。
+        """
+        if operation_type is None:
+            operation_type = SQLParser._get_operation_type(stmt)
+        triggers, first_only = _TABLE_TRIGGERS.get(operation_type, _DEFAULT_TABLE_TRIGGERS)
+        
+        kw, dml, name_type, punct = _T_KEYWORD, _T_DML, _T_NAME, _T_PUNCT
+        skip_words = _TABLE_PREFIX_WORDS
+        # 扫描状态同样绑定为局部变量，循环内只做局部变量访问
+        default, expect_name, after_name, qualified = _STATE_DEFAULT, _STATE_EXPECT_NAME, _STATE_AFTER_NAME, _STATE_QUALIFIED
+        tables = []
+        state = default
         
-        # 递归函数用于深入处理复杂的SQL结构
-        def extract_from_token_list(token_list):
-            local_tables = []
-            in_from_clause = False
-            in_join_clause = False
+        for token in stmt.flatten():
+            ttype = token.ttype
+            if token.is_whitespace:
+                continue
             
-            for token in token_list.tokens:
-                # 检测FROM子句
-                if token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'FROM':
-                    in_from_clause = True
-                    continue
-                
-                # 检测JOIN子句
-                if token.ttype is sqlparse.tokens.Keyword and 'JOIN' in token.value.upper():
-                    in_join_clause = True
+            if ttype is kw or ttype is dml:
+                word = token.normalized
+                if state == expect_name:
+                    if word in skip_words:
+                        continue
+                    if ttype is kw and word not in triggers:
+                        # 与关键字同名的表名（如USER）
+                        tables.append(token.value.strip('`'))
+                        state = after_name
+                        continue
+                elif state == after_name and word == 'AS':
                     continue
                 
-                # 在FROM或JOIN子句后提取表名
-                if in_from_clause or in_join_clause:
-                    if isinstance(token, sqlparse.sql.Identifier):
-                        # 直接引用的表名
-                        if token.get_real_name():
-                            local_tables.append(token.get_real_name())
-                    elif isinstance(token, sqlparse.sql.IdentifierList):
-                        # 多个表，如FROM table1, table2
-                        for identifier in token.get_identifiers():
-                            if identifier.get_real_name():
-                                local_tables.append(identifier.get_real_name())
-                    elif isinstance(token, sqlparse.sql.Function):
-                        # 处理子查询中的函数，可能包含表
-                        local_tables.extend(extract_from_token_list(token))
-                    elif isinstance(token, sqlparse.sql.Parenthesis):
-                        # 可能是子查询
-                        if token.tokens and isinstance(token.tokens[1], sqlparse.sql.Statement):
-                            # 是子查询，递归解析
-                            local_tables.extend(SQLParser._extract_tables(token.tokens[1]))
-                        else:
-                            # 其他括号结构，递归处理
-                            local_tables.extend(extract_from_token_list(token))
-                    
-                    # 重置标志以避免收集其他部分的标识符
-                    if token.ttype in (sqlparse.tokens.Keyword, sqlparse.tokens.Punctuation):
-                        in_from_clause = False
-                        in_join_clause = False
-                
-                # 递归处理其他TokenList
-                if isinstance(token, sqlparse.sql.TokenList) and not isinstance(token, sqlparse.sql.Identifier):
-                    local_tables.extend(extract_from_token_list(token))
-            
-            return local_tables
-        
-        # 特殊处理DML语句
-        if operation_type == 'UPDATE':
-            # UPDATE语句通常在第一个标识符中包含表名
-            for i, token in enumerate(stmt.tokens):
-                if token.ttype is sqlparse.tokens.DML and token.value.upper() == 'UPDATE':
-                    if i+1 < len(stmt.tokens):
-                        if isinstance(stmt.tokens[i+1], sqlparse.sql.Identifier):
-                            tables.append(stmt.tokens[i+1].get_real_name())
-                        elif isinstance(stmt.tokens[i+1], sqlparse.sql.IdentifierList):
-                            # 多表更新
-                            for identifier in stmt.tokens[i+1].get_identifiers():
-                                if identifier.get_real_name():
-                                    tables.append(identifier.get_real_name())
-                    break
-        elif operation_type == 'INSERT':
-            # INSERT语句
-            into_found = False
-            for i, token in enumerate(stmt.tokens):
-                if token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'INTO':
-                    into_found = True
-                elif into_found and isinstance(token, sqlparse.sql.Identifier):
-                    tables.append(token.get_real_name())
-                    break
-                elif into_found and isinstance(token, sqlparse.sql.Function):
-                    # 处理INSERT INTO table(...)
-                    if token.get_name():
-                        tables.append(token.get_name())
-                    break
-        elif operation_type == 'DELETE':
-            # DELETE FROM table
-            from_found = False
-            for i, token in enumerate(stmt.tokens):
-                if token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'FROM':
-                    from_found = True
-                elif from_found and isinstance(token, sqlparse.sql.Identifier):
-                    tables.append(token.get_real_name())
-                    break
-                elif from_found and isinstance(token, sqlparse.sql.IdentifierList):
-                    for identifier in token.get_identifiers():
-                        if identifier.get_real_name():
-                            tables.append(identifier.get_real_name())
+                if state != default and first_only and tables:
                     break
-        elif operation_type in {'CREATE', 'ALTER', 'DROP', 'TRUNCATE'}:
-            # DDL语句
-            table_found = False
-            for i, token in enumerate(stmt.tokens):
-                if token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'TABLE':
-                    table_found = True
-                elif table_found and isinstance(token, sqlparse.sql.Identifier):
-                    tables.append(token.get_real_name())
+                state = expect_name if (word in triggers or 'JOIN' in word and 'JOIN' in triggers) else default
+            elif ttype is name_type:
+                if state == expect_name:
+                    tables.append(token.value.strip('`'))
+                    state = after_name
+                elif state == qualified:
+                    # schema.table，以真实表名替换schema部分
+                    tables[-1] = token.value.strip('`')
+                    state = after_name
+            elif ttype is punct and state == after_name and token.value in ('.', ','):
+                state = qualified if token.value == '.' else expect_name
+            elif state != default:
+                if first_only and tables:
                     break
-        else:
-            # 对于其他语句，通过递归处理提取表名
-            tables.extend(extract_from_token_list(stmt))
+                state = default
         
-        # 移除可能的重复项
-        return list(set([table for table in tables if table]))
+        # 移除空名称和可能的重复项，保持表名出现顺序
+        return list(dict.fromkeys(table for table in tables if table))
     
     @staticmethod
     def _has_where_clause(stmt: sqlparse.sql.Statement) -> bool:
         """检查SQL语句是否包含WHERE子句"""
-        for token in stmt.tokens:
-            if isinstance(token, sqlparse.sql.Where):
-                return True
-        return False
+        return SQLParser._analyze(stmt)[2]
     
     @staticmethod
-    def _has_limit_clause(stmt: sqlparse.sql.Statement) -> bool:
-        """检查SQL语句是否包含LIMIT子句"""
-        # LIMIT通常作为一个关键字出现
+    def has_limit_clause(stmt: sqlparse.sql.Statement) -> bool:
+        """
+        检查SQL语句是否包含作用于外层结果的LIMIT子句
+        
+        只检查顶层token及其直接子token（部分sqlparse版本会把LIMIT归入WHERE分组），
+        子查询中的LIMIT不限制外层结果的行数，不计入。
+        """
+        kw = _T_KEYWORD
         for token in stmt.tokens:
-            if token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'LIMIT':
+            if token.ttype is kw and token.normalized == 'LIMIT':
+                return True
+            if token.is_group and any(sub.ttype is kw and sub.normalized == 'LIMIT' for sub in token.tokens):
                 return True
-            # 处理更复杂的语句结构
-            elif isinstance(token, sqlparse.sql.TokenList):
-                for subtoken in token.tokens:
-                    if subtoken.ttype is sqlparse.tokens.Keyword and subtoken.value.upper() == 'LIMIT':
-                        return True
         return False
     
     @staticmethod
     def _fallback_parse(sql_query: str) -> Dict:
         """当高级解析失败时，回退到基本字符串解析"""
-        sql_upper = sql_query.strip().upper()
-        parts = sql_upper.split()
-        
-        operation_type = parts[0] if parts else ""
+        first_word = _FIRST_WORD_RE.match(sql_query)
+        operation_type = first_word.group(1).upper() if first_word else ""
         
         # 确定操作类别
-        category = 'UNKNOWN'
-        if operation_type in SQLConfig.DDL_OPERATIONS:
-            category = 'DDL'
-        elif operation_type in SQLConfig.DML_OPERATIONS:
-            category = 'DML'
-        elif operation_type in SQLConfig.METADATA_OPERATIONS:
-            category = 'METADATA'
-        
-        # 基本的表名提取
-        tables = []
-        for i, word in enumerate(parts):
-            if word in {'FROM', 'JOIN', 'UPDATE', 'INTO', 'TABLE'}:
-                if i + 1 < len(parts):
-                    table = parts[i + 1].strip('`;')
-                    if table not in {'SELECT', 'WHERE', 'SET'}:
-                        tables.append(table)
+        category = SQLParser._get_operation_category(operation_type)
         
-        # 简单检查WHERE子句
-        has_where = 'WHERE' in sql_upper
+        # 基本的表名提取 - 单次正则扫描，不拆分也不转换整条SQL；schema.table取真实表名
+        tables = {}  # 按出现顺序去重
+        for name in _TABLE_KW_RE.findall(sql_query):
+            table = name.replace('`', '').rsplit('.', 1)[-1]
+            if table and table.upper() not in _NON_TABLE_WORDS:
+                tables[table] = None
         
-        # 简单检查LIMIT子句
-        has_limit = 'LIMIT' in sql_upper
+        # 按单词检查WHERE/LIMIT子句
+        has_where = _WHERE_RE.search(sql_query) is not None
+        has_limit = _LIMIT_RE.search(sql_query) is not None
         
         return {
             'operation_type': operation_type,
-            'tables': list(set(tables)),
+            'tables': list(tables),
             'has_where': has_where,
             'has_limit': has_limit,
             'is_valid': bool(operation_type),
@@ -4,9 +4,6 @@ import asyncio
 from dotenv import load_dotenv
 import atexit
 import signal
-import importlib
-import pkgutil
-import inspect
 import threading
 
 # 加载环境变量 - 移到最前面确保所有模块导入前环境变量已加载
@@ -14,10 +11,8 @@ load_dotenv()
 
 # 导入自定义模块 - 确保在load_dotenv之后导入
 from src.config import ServerConfig, SecurityConfig, DatabaseConfig, ConnectionPoolConfig
-from src.tools.mysql_tool import register_mysql_tool
-from src.tools.mysql_metadata_tool import register_metadata_tools
-from src.tools.mysql_info_tool import register_info_tools
-from src.tools.mysql_schema_tool import register_schema_tools
+from src.db import mysql_available, DRIVER_NAME
+from src.tools import REGISTRARS
 
 # 配置日志
 logging.basicConfig(
@@ -32,15 +27,12 @@ logger.debug(f"当前允许的风险等级: {SecurityConfig.ALLOWED_RISK_LEVELS_
 logger.debug(f"当前环境类型: {SecurityConfig.ENV_TYPE.value}")
 logger.debug(f"是否允许敏感信息查询: {SecurityConfig.ALLOW_SENSITIVE_INFO}")
 
-# 尝试导入MySQL连接器
-try:
-    import aiomysql
-    logger.debug("aiomysql连接器导入成功")
-    mysql_available = True
-except ImportError as e:
-    logger.critical(f"无法导入aiomysql连接器: {str(e)}")
-    logger.critical("请确保已安装aiomysql包: pip install aiomysql")
-    mysql_available = False
+# MySQL驱动可用性由src.db在导入时检测
+if mysql_available:
+    logger.debug(f"{DRIVER_NAME}连接器导入成功")
+else:
+    logger.critical("无法导入MySQL异步驱动")
+    logger.critical("请确保已安装aiomysql或asyncmy包: pip install aiomysql (或 pip install asyncmy)")
 
 # 从配置获取服务器配置
 host = ServerConfig.HOST
@@ -52,40 +44,37 @@ logger.debug("正在创建MCP服务器实例...")
 mcp = FastMCP("MySQL Query Server", "cccccccccc", host=host, port=port, debug=True, endpoint='/sse')
 logger.debug("MCP服务器实例创建完成")
 
-def auto_register_tools(mcp):
+def register_tools(mcp):
     """
-    自动扫描src.tools目录下所有register_开头的函数并注册到mcp
+    依次调用src.tools.REGISTRARS中登记的注册函数，将所有工具注册到mcp
     """
-    import src.tools
-    package = src.tools
-    for finder, name, ispkg in pkgutil.iter_modules(package.__path__, package.__name__ + "."):
-        if ispkg:
-            continue
-        module = importlib.import_module(name)
-        for func_name, func in inspect.getmembers(module, inspect.isfunction):
-            if func_name.startswith("register_") and func_name.endswith("tool") or func_name.endswith("tools"):
-                try:
-                    func(mcp)
-                    logger.info(f"自动注册工具: {name}.{func_name}")
-                except Exception as e:
-                    logger.error(f"自动注册工具失败: {name}.{func_name} - {e}")
-
-# 注册MySQL基础查询工具
-auto_register_tools(mcp)
-logger.debug("已自动注册所有MySQL工具")
+    for registrar in REGISTRARS:
+        name = f"{registrar.__module__}.{registrar.__name__}"
+        try:
+            registrar(mcp)
+            logger.info(f"注册工具: {name}")
+        except Exception as e:
+            logger.error(f"注册工具失败: {name} - {e}")
+
+# 注册所有MySQL工具
+register_tools(mcp)
+logger.debug("已注册所有MySQL工具")
+
+# 连接池定时回收任务的停止信号，cleanup_resources设置后后台线程立即退出
+_cleanup_stop = threading.Event()
 
 # 启动连接池定时回收任务
 def _start_pool_cleanup_task():
     """启动后台线程定期回收连接池资源"""
-    import time
     from src.db.mysql_operations import _cleanup_unused_pools
+    interval = ConnectionPoolConfig.get_config()['cleanup_interval']
     def _loop():
-        while True:
+        # 等待停止信号代替sleep，关闭时无需等到下一个周期
+        while not _cleanup_stop.wait(interval):
             try:
                 _cleanup_unused_pools()
             except Exception as e:
                 logger.warning(f"定时回收连接池异常: {e}")
-            time.sleep(300)  # 每5分钟回收一次
     t = threading.Thread(target=_loop, daemon=True)
     t.start()
 
@@ -97,6 +86,7 @@ _server_data = {
 
 def cleanup_resources():
     """清理资源，关闭连接池"""
+    _cleanup_stop.set()
     if _server_data['loop'] and _server_data['db_initialized']:
         try:
             # 导入连接池关闭函数
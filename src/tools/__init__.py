@@ -1,3 +1,17 @@
 """
 MySQL工具包
-""" 
\ No newline at end of file
+
+REGISTRARS列出所有工具注册函数，服务器启动时依次调用，新增工具模块时在此登记。
+"""
+
+from .mysql_tool import register_mysql_tool
+from .mysql_metadata_tool import register_metadata_tools
+from .mysql_info_tool import register_info_tools
+from .mysql_schema_tool import register_schema_tools
+
+REGISTRARS = (
+    register_mysql_tool,
+    register_metadata_tools,
+    register_info_tools,
+    register_schema_tools,
+)
@@ -5,25 +5,54 @@ MySQL元数据工具基类
 
 import json
 import logging
+import time
 from typing import Any, Dict, List, Optional, Union, Callable
 import functools
 
+try:
+    import orjson
+except ImportError:  # orjson为可选依赖，未安装时回退到标准库json
+    orjson = None
+
+from src.config import SQLConfig
 from src.db.mysql_operations import get_db_connection, execute_query
 from src.validators import SQLValidators, ValidationError
 
 logger = logging.getLogger("mysql_server")
 
+if orjson is not None:
+    # 日期时间交给default=str处理，保持与标准库json一致的输出格式
+    _ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+
+    def _dumps(obj: Any) -> str:
+        """序列化为JSON字符串（orjson实现）"""
+        return orjson.dumps(obj, default=str, option=_ORJSON_OPTIONS).decode()
+else:
+    def _dumps(obj: Any) -> str:
+        """序列化为JSON字符串（标准库实现）"""
+        return json.dumps(obj, default=str)
+
+# 元数据结果外层结构: {"metadata_info": {...}, "results": [...]}
+_RESULTS_TEMPLATE = '{"metadata_info":{"operation_type":%s,"result_count":%d},"results":%s}'
+# 错误响应结构: {"error": ..., "error_type": ...}，只需序列化错误消息
+_ERROR_TEMPLATE = '{"error":%s,"error_type":"%s"}'
+
+# 元数据查询结果缓存: (查询, 参数, 操作类型) -> (过期时间, JSON结果)
+# 表结构变化不频繁，短时间内的重复查询直接返回缓存结果
+_METADATA_CACHE: Dict[tuple, tuple] = {}
+_METADATA_CACHE_MAX_SIZE = 256
+
 class MySQLToolError(Exception):
     """MySQL工具异常基类"""
-    pass
+    __slots__ = ()
 
 class ParameterValidationError(MySQLToolError):
     """参数验证错误"""
-    pass
+    __slots__ = ()
 
 class QueryExecutionError(MySQLToolError):
     """查询执行错误"""
-    pass
+    __slots__ = ()
 
 class MetadataToolBase:
     """
@@ -35,6 +64,18 @@ class MetadataToolBase:
     - 异常处理
     """
     
+    @staticmethod
+    def strip_empty_marker(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        去掉execute_query在元数据查询没有结果时返回的占位行
+        
+        占位行形如{'metadata_operation': ..., 'result_count': 0}，不是真实数据，
+        需要按列处理结果的调用方先调用此方法，没有结果时得到空列表
+        """
+        if results and 'metadata_operation' in results[0]:
+            return [row for row in results if 'metadata_operation' not in row]
+        return results
+    
     @staticmethod
     def validate_parameter(param_name: str, param_value: Any, validator: Callable[[Any], bool], 
                           error_message: str) -> None:
@@ -55,6 +96,25 @@ class MetadataToolBase:
         except ValidationError as e:
             raise ParameterValidationError(str(e))
     
+    @staticmethod
+    def dumps(obj: Any) -> str:
+        """
+        将对象序列化为JSON字符串（安装orjson时使用orjson）
+        
+        无法直接序列化的值（日期时间、Decimal等）转为字符串
+        """
+        return _dumps(obj)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=1024)
+    def table_ref(table: str, database: Optional[str] = None) -> str:
+        """
+        生成带反引号的表引用，指定数据库时为`database`.`table`
+        
+        调用方需先验证表名和数据库名，结果按参数缓存，重复查询同一张表时不再拼接字符串
+        """
+        return f"`{database}`.`{table}`" if database else f"`{table}`"
+    
     @staticmethod
     def format_results(results: List[Dict[str, Any]], operation_type: str = "元数据查询") -> str:
         """
@@ -68,19 +128,12 @@ class MetadataToolBase:
             格式化后的JSON字符串
         """
         try:
-            # 添加元数据头部信息
-            metadata_info = {
-                "metadata_info": {
-                    "operation_type": operation_type,
-                    "result_count": len(results)
-                },
-                "results": results
-            }
-            return json.dumps(metadata_info, default=str)
+            # 直接拼接固定的元数据头部与序列化后的结果，避免构造外层字典
+            return _RESULTS_TEMPLATE % (_dumps(operation_type), len(results), _dumps(results))
         except Exception as e:
             logger.error(f"结果格式化失败: {str(e)}")
             # 如果格式化失败，尝试直接序列化结果
-            return json.dumps({"error": f"结果格式化失败: {str(e)}"})
+            return _dumps({"error": f"结果格式化失败: {str(e)}"})
     
     @staticmethod
     def handle_query_error(func):
@@ -93,24 +146,20 @@ class MetadataToolBase:
                 return await func(*args, **kwargs)
             except ParameterValidationError as e:
                 logger.error(f"参数验证错误: {str(e)}")
-                return json.dumps({
-                    "error": f"参数错误: {str(e)}",
-                    "error_type": "ParameterValidationError"
-                })
+                return _ERROR_TEMPLATE % (_dumps(f"参数错误: {str(e)}"), "ParameterValidationError")
             except QueryExecutionError as e:
                 logger.error(f"查询执行错误: {str(e)}")
-                return json.dumps({
-                    "error": f"查询执行失败: {str(e)}",
-                    "error_type": "QueryExecutionError"
-                })
+                return _ERROR_TEMPLATE % (_dumps(f"查询执行失败: {str(e)}"), "QueryExecutionError")
             except Exception as e:
                 logger.error(f"未预期的错误: {str(e)}")
-                return json.dumps({
-                    "error": f"操作失败: {str(e)}",
-                    "error_type": "UnexpectedError"
-                })
+                return _ERROR_TEMPLATE % (_dumps(f"操作失败: {str(e)}"), "UnexpectedError")
         return wrapper
         
+    @staticmethod
+    def clear_metadata_cache() -> None:
+        """清空元数据查询结果缓存，在执行表结构变更后调用"""
+        _METADATA_CACHE.clear()
+    
     @staticmethod
     async def execute_metadata_query(query: str, params: Optional[Dict[str, Any]] = None, 
                                     operation_type: str = "元数据查询") -> str:
@@ -125,10 +174,25 @@ class MetadataToolBase:
         Returns:
             查询结果的JSON字符串
         """
+        ttl = SQLConfig.METADATA_CACHE_TTL
+        cache_key = None
+        if ttl > 0:
+            cache_key = (query, tuple(sorted(params.items())) if params else None, operation_type)
+            cached = _METADATA_CACHE.get(cache_key)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+        
         try:
             async with get_db_connection() as connection:
                 results = await execute_query(connection, query, params)
-                return MetadataToolBase.format_results(results, operation_type)
+                formatted = MetadataToolBase.format_results(results, operation_type)
         except Exception as e:
             logger.error(f"元数据查询执行失败: {str(e)}")
-            raise QueryExecutionError(str(e)) from e  # 保留原始异常链 
\ No newline at end of file
+            raise QueryExecutionError(str(e)) from e  # 保留原始异常链
+        
+        if cache_key is not None:
+            if len(_METADATA_CACHE) >= _METADATA_CACHE_MAX_SIZE:
+                # 缓存已满时淘汰最早写入的条目
+                del _METADATA_CACHE[next(iter(_METADATA_CACHE))]
+            _METADATA_CACHE[cache_key] = (time.monotonic() + ttl, formatted)
+        return formatted
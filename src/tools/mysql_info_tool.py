@@ -3,20 +3,28 @@ MySQL数据库信息查询工具
 提供数据库、变量和状态等系统信息查询功能
 """
 
-import json
+import functools
 import logging
 import re
 import os
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
 from mcp.server.fastmcp import FastMCP
 
 from .metadata_base_tool import MetadataToolBase, ParameterValidationError, QueryExecutionError
 from src.security.sql_analyzer import EnvironmentType
-from src.db.mysql_operations import get_db_connection, execute_query
+from src.db.mysql_operations import get_db_connection, execute_query, sql_analyzer
 from src.validators import SQLValidators
 
 logger = logging.getLogger("mysql_server")
 
+# 参数验证器，模块加载时绑定一次，每次调用无需创建lambda
+_validate_limit = functools.partial(SQLValidators.validate_integer, min_value=0)
+
+@functools.lru_cache(maxsize=128)
+def _like_to_regex(pattern: str) -> "re.Pattern":
+    """将LIKE模式转换为在任意位置匹配、不区分大小写的正则（%匹配任意字符串，_匹配单个字符）"""
+    return re.compile(re.escape(pattern).replace('%', '.*').replace('_', '.'), re.IGNORECASE)
+
 # 自定义异常类
 class SecurityError(QueryExecutionError):
     """安全限制错误"""
@@ -32,14 +40,27 @@ def get_sensitive_patterns():
     
     env_patterns = os.getenv('SENSITIVE_INFO_FIELDS', '')
     if env_patterns:
-        # 合并自定义模式和默认模式
+        # 合并默认模式和自定义模式，按出现顺序去重，保证编译出的匹配模式在每次启动时一致
         patterns = [pattern.strip() for pattern in env_patterns.split(',') if pattern.strip()]
-        return list(set(patterns + default_patterns))
+        return list(dict.fromkeys(default_patterns + patterns))
     
     return default_patterns
 
+def _compile_sensitive_patterns(patterns: List[str]) -> Tuple[FrozenSet[str], Optional[re.Pattern]]:
+    """
+    编译敏感字段模式
+    
+    纯字母模式作为字面量关键字，用子串查找预筛；其余模式合并编译为一个忽略大小写的正则表达式，
+    每个变量名只需匹配一次。没有非字面量模式时正则为None。
+    """
+    tokens = frozenset(pattern.lower() for pattern in patterns if pattern.isalpha())
+    regex_patterns = [pattern for pattern in patterns if not pattern.isalpha()]
+    regex = re.compile('|'.join(f'(?:{pattern})' for pattern in regex_patterns), re.IGNORECASE) if regex_patterns else None
+    return tokens, regex
+
 # 敏感变量和状态关键字列表
 SENSITIVE_VARIABLE_PATTERNS = get_sensitive_patterns()
+_SENSITIVE_TOKENS, _SENSITIVE_RE = _compile_sensitive_patterns(SENSITIVE_VARIABLE_PATTERNS)
 
 # 敏感变量名前缀，生产环境中这些变量的值会被隐藏
 SENSITIVE_VARIABLE_PREFIXES = [
@@ -47,6 +68,12 @@ SENSITIVE_VARIABLE_PREFIXES = [
     "authentication", "secure", "credential", "token"
 ]
 
+# 是否隐藏敏感变量的值：环境类型在启动时确定，只在生产环境中过滤
+_REDACT_ENABLED = sql_analyzer.env_type == EnvironmentType.PRODUCTION
+
+# 系统数据库名称
+SYSTEM_DATABASES = frozenset({'information_schema', 'mysql', 'performance_schema', 'sys'})
+
 # 变量名和值字段映射
 VARIABLE_NAME_FIELDS = ['Variable_name', 'variable_name', 'name', 'Name', 'key', 'Key', 'Setting']
 VALUE_FIELDS = ['Value', 'value', 'variable_value', 'val', 'setting', 'Setting_Value']
@@ -89,36 +116,43 @@ def filter_sensitive_info(results: List[Dict[str, Any]], filter_patterns: List[s
     Returns:
         过滤后的结果列表
     """
-    if not filter_patterns:
-        filter_patterns = SENSITIVE_VARIABLE_PATTERNS
+    # 默认模式使用模块加载时预编译的结果，自定义模式每次调用只编译一次
+    if filter_patterns:
+        sensitive_tokens, sensitive_re = _compile_sensitive_patterns(filter_patterns)
+    else:
+        sensitive_tokens, sensitive_re = _SENSITIVE_TOKENS, _SENSITIVE_RE
         
+    if not results:
+        return results
+    
+    # 同一结果集的每行字段相同，根据第一行确定变量名字段和所有值字段
+    first_row = results[0]
+    name_field = next((field for field in VARIABLE_NAME_FIELDS if field in first_row), None)
+    value_fields = [field for field in VALUE_FIELDS if field in first_row]
+    
+    # 没有变量名字段时无法判断是否敏感，没有值字段时无需隐藏，均原样返回
+    if not name_field or not value_fields:
+        return results
+    
     filtered_results = []
     for item in results:
-        # 复制一份，避免修改原始数据
-        filtered_item = item.copy()
+        var_name = str(item[name_field])
+        # 先用字面量关键字做子串预筛，未命中时才交给正则匹配
+        low_name = var_name.lower()
+        is_sensitive = (
+            any(token in low_name for token in sensitive_tokens)
+            or (sensitive_re is not None and sensitive_re.search(var_name) is not None)
+        )
         
-        # 确定哪个字段包含变量名
-        name_field = None
-        for field in VARIABLE_NAME_FIELDS:
-            if field in filtered_item:
-                name_field = field
-                break
-                
-        # 如果找到变量名字段，检查是否敏感
-        if name_field:
-            var_name = str(filtered_item[name_field]).lower()
-            # 检查是否匹配敏感模式
-            is_sensitive = any(re.search(pattern, var_name, re.IGNORECASE) for pattern in filter_patterns)
-            
-            if is_sensitive:
-                # 找出所有可能的值字段
-                for value_field in VALUE_FIELDS:
-                    if value_field in filtered_item:
-                        # 敏感信息，隐藏具体的值
-                        filtered_item[value_field] = '*** HIDDEN ***'
-                        logger.debug(f"已隐藏敏感变量 '{var_name}' 的值")
+        if is_sensitive:
+            # 只在需要隐藏值时复制一份，避免修改原始数据
+            item = dict(item)
+            for value_field in value_fields:
+                # 敏感信息，隐藏具体的值
+                item[value_field] = '*** HIDDEN ***'
+            logger.debug("已隐藏敏感变量 '%s' 的值", var_name)
                         
-        filtered_results.append(filtered_item)
+        filtered_results.append(item)
         
     return filtered_results
 
@@ -138,7 +172,7 @@ def register_info_tools(mcp: FastMCP):
         获取所有数据库列表，支持筛选和限制结果数量
         
         Args:
-            pattern: 数据库名称匹配模式 (可选, 例如 '%test%')
+            pattern: 数据库名称匹配模式 (可选, 例如 '%test%'，在名称任意位置匹配且不区分大小写)
             limit: 返回结果的最大数量 (默认100，设为0表示无限制)
             exclude_system: 是否排除系统数据库 (默认为True)
             
@@ -155,7 +189,7 @@ def register_info_tools(mcp: FastMCP):
         
         MetadataToolBase.validate_parameter(
             "limit", limit,
-            lambda x: SQLValidators.validate_integer(x, min_value=0),
+            _validate_limit,
             "返回结果的最大数量必须是非负整数"
         )
         
@@ -164,39 +198,28 @@ def register_info_tools(mcp: FastMCP):
         
         # 执行查询 - 使用异步上下文管理器，不要求预先指定数据库
         async with get_db_connection(require_database=False) as connection:
-            # 先获取所有数据库
-            results = await execute_query(connection, query)
+            # 先获取所有数据库，total_count为服务器上的数据库总数
+            results = MetadataToolBase.strip_empty_marker(await execute_query(connection, query))
             
             # 通常结果中每个数据库名会在"Database"字段
             db_field = next((k for k in results[0].keys() if k.lower() == 'database'), None) if results else None
             
-            if not db_field:
+            if results and not db_field:
                 logger.warning("查询结果未找到数据库名称字段")
                 return MetadataToolBase.format_results(results, operation_type="数据库列表查询")
             
-            # 对结果进行过滤
-            filtered_results = []
-            system_dbs = ['information_schema', 'mysql', 'performance_schema', 'sys']
-            
-            for item in results:
-                db_name = item[db_field]
-                
-                # 排除系统数据库
-                if exclude_system and db_name.lower() in system_dbs:
-                    continue
-                    
-                # 根据模式过滤
-                if pattern:
-                    pattern_regex = pattern.replace('%', '.*').replace('_', '.')
-                    if not re.search(pattern_regex, db_name, re.IGNORECASE):
-                        continue
-                        
-                filtered_results.append(item)
+            # 排除系统数据库，并按模式在名称任意位置匹配（不区分大小写）
+            pattern_re = _like_to_regex(pattern) if pattern else None
+            filtered_results = [
+                item for item in results
+                if not (exclude_system and item[db_field].lower() in SYSTEM_DATABASES)
+                and (pattern_re is None or pattern_re.search(item[db_field]))
+            ]
             
             # 限制返回数量
             if limit > 0 and len(filtered_results) > limit:
                 filtered_results = filtered_results[:limit]
-                logger.debug(f"结果数量已限制为前{limit}个")
+                logger.debug("结果数量已限制为前%d个", limit)
             
             # 返回结果
             metadata_info = {
@@ -213,7 +236,7 @@ def register_info_tools(mcp: FastMCP):
                 "results": filtered_results
             }
             
-            return json.dumps(metadata_info, default=str)
+            return MetadataToolBase.dumps(metadata_info)
     
     @mcp.tool()
     @MetadataToolBase.handle_query_error
@@ -229,7 +252,6 @@ def register_info_tools(mcp: FastMCP):
             系统变量的JSON字符串
         """
         # 获取当前环境类型
-        from src.security.sql_analyzer import sql_analyzer
         env_type = sql_analyzer.env_type
         
         # 检查环境权限
@@ -247,16 +269,18 @@ def register_info_tools(mcp: FastMCP):
         # 构建查询
         scope = "GLOBAL" if global_scope else "SESSION"
         query = f"SHOW {scope} VARIABLES"
+        params = None
         if pattern:
-            query += f" LIKE '{pattern}'"
+            query += " LIKE %(pattern)s"
+            params = {'pattern': pattern}
             
-        logger.debug(f"执行查询: {query}")
+        logger.debug("执行查询: %s, 参数: %s", query, params)
         
         async with get_db_connection() as connection:
-            results = await execute_query(connection, query)
+            results = await execute_query(connection, query, params)
             
             # 生产环境中过滤敏感信息
-            if env_type == EnvironmentType.PRODUCTION:
+            if _REDACT_ENABLED:
                 results = filter_sensitive_info(results)
                 
             return MetadataToolBase.format_results(results, operation_type="系统变量查询")
@@ -275,7 +299,6 @@ def register_info_tools(mcp: FastMCP):
             服务器状态的JSON字符串
         """
         # 获取当前环境类型
-        from src.security.sql_analyzer import sql_analyzer
         env_type = sql_analyzer.env_type
         
         # 检查环境权限
@@ -293,16 +316,18 @@ def register_info_tools(mcp: FastMCP):
         # 构建查询
         scope = "GLOBAL" if global_scope else "SESSION"
         query = f"SHOW {scope} STATUS"
+        params = None
         if pattern:
-            query += f" LIKE '{pattern}'"
+            query += " LIKE %(pattern)s"
+            params = {'pattern': pattern}
             
-        logger.debug(f"执行查询: {query}")
+        logger.debug("执行查询: %s, 参数: %s", query, params)
         
         async with get_db_connection() as connection:
-            results = await execute_query(connection, query)
+            results = await execute_query(connection, query, params)
             
             # 生产环境中过滤敏感信息
-            if env_type == EnvironmentType.PRODUCTION:
+            if _REDACT_ENABLED:
                 results = filter_sensitive_info(results)
                 
             return MetadataToolBase.format_results(results, operation_type="服务器状态查询") 
\ No newline at end of file
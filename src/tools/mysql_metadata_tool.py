@@ -3,9 +3,8 @@ MySQL元数据查询工具
 提供表结构等元数据信息查询功能
 """
 
-import json
+import functools
 import logging
-import re
 from typing import Any, Dict, List, Optional
 from mcp.server.fastmcp import FastMCP
 
@@ -15,6 +14,9 @@ from src.validators import SQLValidators
 
 logger = logging.getLogger("mysql_server")
 
+# 参数验证器，模块加载时绑定一次，每次调用无需创建lambda
+_validate_limit = functools.partial(SQLValidators.validate_integer, min_value=0)
+
 def register_metadata_tools(mcp: FastMCP):
     """
     注册MySQL元数据查询工具到MCP服务器
@@ -57,77 +59,43 @@ def register_metadata_tools(mcp: FastMCP):
             
         MetadataToolBase.validate_parameter(
             "limit", limit,
-            lambda x: SQLValidators.validate_integer(x, min_value=0),
+            _validate_limit,
             "返回结果的最大数量必须是非负整数"
         )
         
-        # 基础查询
+        params = None
+        # 未指定数据库时无法在WHERE中引用表名列Tables_in_<数据库>，此时按名称LIKE过滤后在结果中排除视图
+        filter_views = bool(exclude_views and pattern and not database)
         base_query = "SHOW FULL TABLES" if exclude_views else "SHOW TABLES"
         if database:
             base_query += f" FROM `{database}`"
-        if pattern:
-            base_query += f" LIKE '{pattern}'"
+        if exclude_views and not filter_views:
+            # 排除视图时由服务器按表类型过滤
+            base_query += " WHERE Table_type = 'BASE TABLE'"
+            if pattern:
+                base_query += f" AND `Tables_in_{database}` LIKE %(pattern)s"
+                params = {'pattern': pattern}
+        elif pattern:
+            base_query += " LIKE %(pattern)s"
+            params = {'pattern': pattern}
             
-        logger.debug(f"执行查询: {base_query}")
+        logger.debug("执行查询: %s, 参数: %s", base_query, params)
         
         # 执行查询 - 使用异步上下文管理器
         async with get_db_connection() as connection:
-            results = await execute_query(connection, base_query)
-            
-            # 如果需要排除视图，且使用的是SHOW FULL TABLES
-            if exclude_views and "FULL" in base_query:
-                filtered_results = []
-                
-                # 查找表名和表类型字段
-                if results:
-                    # 确定表名和表类型字段名
-                    field_names = list(results[0].keys())
-                    table_type_field = None
-                    table_field = None
-                    
-                    # 查找表类型字段 - 这通常是'Table_type'，但也检查其他可能的名称
-                    possible_type_fields = ['Table_type', 'table_type', 'type']
-                    for field in possible_type_fields:
-                        if field in field_names:
-                            table_type_field = field
-                            break
-                    
-                    # 查找表名字段 - 这可能是结果中的第一个字段
-                    for field in field_names:
-                        if field != table_type_field:  # 表名不会是类型字段
-                            if field.lower() in ['table', 'name', 'table_name', 'tables_in_']:
-                                table_field = field
-                                break
-                    
-                    # 如果没找到明确的表名字段，使用第一个非类型字段
-                    if not table_field and len(field_names) > 0:
-                        for field in field_names:
-                            if field != table_type_field:
-                                table_field = field
-                                break
-                
-                    # 只有当我们能确定表名和类型字段时才进行过滤
-                    if table_field and table_type_field:
-                        logger.debug(f"表名字段: {table_field}, 表类型字段: {table_type_field}")
-                        # 只保留基表 (BASE TABLE)，排除视图和其他对象
-                        for item in results:
-                            if item[table_type_field] == 'BASE TABLE':
-                                filtered_results.append(item)
-                    else:
-                        # 如果无法确定字段，保留所有结果并记录警告
-                        logger.warning("无法确定表类型字段，无法排除视图")
-                        filtered_results = results
-                else:
-                    filtered_results = []
-            else:
-                filtered_results = results
+            # 没有结果时去掉占位行，两种查询方式都得到空列表
+            results = MetadataToolBase.strip_empty_marker(await execute_query(connection, base_query, params))
+            if filter_views:
+                results = [row for row in results if row['Table_type'] == 'BASE TABLE']
+            # 总数统计排除视图之后、数量限制之前的表，与服务器端过滤时一致
+            total_count = len(results)
                 
             # 限制返回数量
-            if limit > 0 and len(filtered_results) > limit:
-                limited_results = filtered_results[:limit]
+            if limit > 0 and len(results) > limit:
+                limited_results = results[:limit]
                 is_limited = True
             else:
-                limited_results = filtered_results
+                limited_results = results
                 is_limited = False
                 
             # 构造元数据
@@ -135,18 +103,18 @@ def register_metadata_tools(mcp: FastMCP):
                 "metadata_info": {
                     "operation_type": "表列表查询",
                     "result_count": len(limited_results),
-                    "total_count": len(results),
+                    "total_count": total_count,
                     "filtered": {
                         "database": database,
                         "pattern": pattern,
-                        "exclude_views": exclude_views and "FULL" in base_query,
+                        "exclude_views": exclude_views,
                         "limited": is_limited
                     }
                 },
                 "results": limited_results
             }
             
-            return json.dumps(metadata_info, default=str)
+            return MetadataToolBase.dumps(metadata_info)
     
     @mcp.tool()
     @MetadataToolBase.handle_query_error
@@ -175,8 +143,8 @@ def register_metadata_tools(mcp: FastMCP):
                 "数据库名称只能包含字母、数字和下划线"
             )
             
-        query = f"SHOW COLUMNS FROM `{table}`" if not database else f"SHOW COLUMNS FROM `{database}`.`{table}`"
-        logger.debug(f"执行查询: {query}")
+        query = f"SHOW COLUMNS FROM {MetadataToolBase.table_ref(table, database)}"
+        logger.debug("执行查询: %s", query)
         
         return await MetadataToolBase.execute_metadata_query(query, operation_type="表列信息查询")
 
@@ -207,8 +175,8 @@ def register_metadata_tools(mcp: FastMCP):
                 "数据库名称只能包含字母、数字和下划线"
             )
             
-        query = f"DESCRIBE `{table}`" if not database else f"DESCRIBE `{database}`.`{table}`"
-        logger.debug(f"执行查询: {query}")
+        query = f"DESCRIBE {MetadataToolBase.table_ref(table, database)}"
+        logger.debug("执行查询: %s", query)
         
         return await MetadataToolBase.execute_metadata_query(query, operation_type="表结构描述查询")
 
@@ -239,8 +207,7 @@ def register_metadata_tools(mcp: FastMCP):
                 "数据库名称只能包含字母、数字和下划线"
             )
             
-        table_ref = f"`{table}`" if not database else f"`{database}`.`{table}`"
-        query = f"SHOW CREATE TABLE {table_ref}"
-        logger.debug(f"执行查询: {query}")
+        query = f"SHOW CREATE TABLE {MetadataToolBase.table_ref(table, database)}"
+        logger.debug("执行查询: %s", query)
         
         return await MetadataToolBase.execute_metadata_query(query, operation_type="表创建语句查询")
\ No newline at end of file
@@ -3,18 +3,309 @@ MySQL表结构高级查询工具
 提供索引、约束、表状态等高级元数据查询功能
 """
 
-import json
+import asyncio
+import functools
 import logging
 import re
-from typing import Any, Dict, List, Optional, Union
+import time
+import sqlparse
+from typing import Any, Dict, List, Optional, Tuple, Union
 from mcp.server.fastmcp import FastMCP
 
 from .metadata_base_tool import MetadataToolBase, ParameterValidationError, QueryExecutionError
-from src.db.mysql_operations import get_db_connection, execute_query
+from src.config import ConnectionPoolConfig, SQLConfig
+from src.db.mysql_operations import (
+    get_db_connection, get_pool_for_current_loop, execute_query, iter_query_rows, get_current_database
+)
+from src.security.sql_parser import SQLParser
 from src.validators import SQLValidators
 
 logger = logging.getLogger("mysql_server")
 
+# 参数验证器，模块加载时绑定一次，每次调用无需创建lambda
+_validate_page = functools.partial(SQLValidators.validate_integer, min_value=1)
+_validate_page_size = functools.partial(SQLValidators.validate_integer, min_value=1, max_value=1000)
+
+# 分页查询只支持SELECT，直接在原始SQL上匹配，不生成去空白/转大写的副本
+_SELECT_PREFIX_RE = re.compile(r'\s*SELECT\b', re.IGNORECASE)
+
+# COUNT查询改写：出现这些顶层关键字时结果行数与FROM/WHERE匹配的行数不同，需保留子查询
+_COUNT_SUBQUERY_KEYWORDS = frozenset({'DISTINCT', 'DISTINCTROW', 'GROUP BY', 'HAVING', 'WINDOW'})
+
+# 连接池足够大且有空闲连接时，分页查询的当前页与总数查询使用两个连接并发执行，连接池过小时串行执行以免占满连接池
+_CONCURRENT_COUNT_ENABLED = ConnectionPoolConfig.get_config()['maxsize'] >= 4
+
+# 可以直接在选择列表前插入COUNT(*) OVER()的查询：不含DISTINCT/UNION/已有窗口函数及SELECT修饰符
+# 这些情况下窗口计数与实际结果行数不一致或插入位置无效，继续使用COUNT子查询
+_WINDOW_COUNT_UNSAFE_RE = re.compile(r'\b(?:DISTINCT|DISTINCTROW|UNION|OVER|ALL|HIGH_PRIORITY|STRAIGHT_JOIN|SQL_\w+)\b', re.IGNORECASE)
+# 选择列表以单独的*开头
+_SELECT_STAR_RE = re.compile(r'\s*SELECT\s+\*', re.IGNORECASE)
+# 窗口计数列名，返回结果前从每行中移除
+_WINDOW_TOTAL_COLUMN = '__mcp_total_rows'
+# 服务器是否支持窗口函数（MySQL 8.0+ / MariaDB 10.2+），首次分页查询时检测一次
+_window_count_supported: Optional[bool] = None
+
+# 分页结果外层结构，元数据与逐行序列化得到的结果数组直接拼接
+_PAGINATION_TEMPLATE = '{"metadata_info":%s,"results":%s}'
+
+# 外键查询，mysql_show_foreign_keys与mysql_show_table_details共用
+# 未指定database时由COALESCE回退到当前连接的数据库，无需额外执行SELECT DATABASE()
+_FOREIGN_KEYS_QUERY = """
+SELECT 
+    CONSTRAINT_NAME, 
+    TABLE_NAME,
+    COLUMN_NAME,
+    REFERENCED_TABLE_NAME,
+    REFERENCED_COLUMN_NAME,
+    UPDATE_RULE,
+    DELETE_RULE
+FROM 
+    INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
+JOIN 
+    INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS rc
+ON 
+    kcu.CONSTRAINT_NAME = rc.CONSTRAINT_NAME
+WHERE 
+    kcu.TABLE_SCHEMA = COALESCE(%(table_schema)s, DATABASE())
+    AND kcu.TABLE_NAME = %(table_name)s
+    AND kcu.REFERENCED_TABLE_NAME IS NOT NULL
+"""
+
+# 分页总记录数缓存: 基础查询 -> (过期时间, 总记录数)
+# 翻页时基础查询不变，后续页直接复用第一次的计数，不再重复执行COUNT子查询
+_COUNT_CACHE: Dict[str, tuple] = {}
+_COUNT_CACHE_MAX_SIZE = 256
+
+def _get_cached_count(base_query: str) -> Optional[int]:
+    """获取缓存的总记录数，未命中或已过期时返回None"""
+    cached = _COUNT_CACHE.get(base_query)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+    return None
+
+@functools.lru_cache(maxsize=512)
+def _has_limit_clause(base_query: str) -> bool:
+    """
+    检查查询顶层是否已有LIMIT子句，结果按查询文本缓存
+    
+    不含LIMIT字样的查询直接返回，无需解析；子查询（括号分组内）和字符串中的LIMIT不影响分页。
+    """
+    if 'LIMIT' not in base_query.upper():
+        return False
+    try:
+        statements = sqlparse.parse(base_query)
+    except Exception:
+        # 无法解析时保守处理，视为已有LIMIT
+        return True
+    return any(SQLParser.has_limit_clause(statement) for statement in statements)
+
+def _build_count_query(base_query: str) -> str:
+    """
+    构建获取基础查询总记录数的COUNT查询
+    
+    顶层ORDER BY不影响行数，直接去掉；不含DISTINCT/GROUP BY/HAVING/UNION且选择列表中没有
+    函数调用（可能是聚合函数）时，直接对FROM/WHERE部分计数，不再包一层子查询。
+    """
+    subquery_form = "SELECT COUNT(*) as total FROM ({}) as subquery"
+    try:
+        tokens = sqlparse.parse(base_query)[0].tokens
+    except Exception:
+        return subquery_form.format(base_query)
+    
+    select_idx = from_idx = order_idx = None
+    needs_subquery = False
+    # 子查询位于括号分组内，只扫描顶层token
+    for idx, token in enumerate(tokens):
+        if token.ttype is sqlparse.tokens.DML and token.normalized == 'SELECT':
+            if select_idx is None:
+                select_idx = idx
+            else:
+                needs_subquery = True
+        elif token.ttype is sqlparse.tokens.Keyword:
+            word = token.normalized
+            if word == 'FROM':
+                if from_idx is None:
+                    from_idx = idx
+            elif word == 'ORDER BY':
+                order_idx = idx
+            elif word in _COUNT_SUBQUERY_KEYWORDS or word.startswith('UNION'):
+                needs_subquery = True
+    
+    if select_idx is None:
+        return subquery_form.format(base_query)
+    
+    body = tokens[:order_idx] if order_idx is not None else tokens
+    if (from_idx is None or needs_subquery
+            or any('(' in str(token) for token in tokens[select_idx + 1:from_idx])):
+        return subquery_form.format(''.join(str(token) for token in body).strip())
+    return "SELECT COUNT(*) as total " + ''.join(str(token) for token in body[from_idx:]).strip()
+
+async def _fetch_total(connection, base_query: str, page_size: int) -> Optional[int]:
+    """
+    执行COUNT查询获取基础查询的总记录数，失败时返回None
+    
+    多页的结果会写入计数缓存，供后续翻页复用。
+    """
+    try:
+        # 由于无法参数化子查询，我们改为构建一个只返回计数的查询
+        # 这仍有SQL注入风险，但我们已经验证查询只能是SELECT
+        count_query = _build_count_query(base_query)
+        # 计数查询通常只返回一行，不需要流式处理
+        count_results = await execute_query(connection, count_query)
+        total = count_results[0]['total'] if count_results else 0
+    except Exception as e:
+        logger.warning(f"无法执行总数查询: {str(e)}")
+        return None
+    
+    # 只有多页的结果才会翻页，单页结果不缓存
+    if total > page_size:
+        _cache_count(base_query, total)
+    return total
+
+async def _supports_window_count(connection) -> bool:
+    """检测服务器版本是否支持窗口函数，结果在进程内缓存"""
+    global _window_count_supported
+    if _window_count_supported is None:
+        try:
+            version_results = await execute_query(connection, "SELECT VERSION() AS version LIMIT 1")
+            version = str(version_results[0]['version']) if version_results else ''
+            numbers = re.findall(r'\d+', version)
+            major, minor = (int(numbers[0]), int(numbers[1])) if len(numbers) >= 2 else (0, 0)
+            if 'mariadb' in version.lower():
+                _window_count_supported = (major, minor) >= (10, 2)
+            else:
+                _window_count_supported = major >= 8
+        except Exception as e:
+            logger.warning(f"无法检测MySQL服务器版本: {str(e)}")
+            _window_count_supported = False
+    return _window_count_supported
+
+def _add_window_count(base_query: str) -> str:
+    """在SELECT选择列表中加入COUNT(*) OVER()列，单独的*必须位于选择列表首位，此时将计数列放在其后"""
+    match = _SELECT_STAR_RE.match(base_query)
+    if match:
+        return f"{match.group(0)}, COUNT(*) OVER() AS {_WINDOW_TOTAL_COLUMN} {base_query[match.end():]}"
+    return _SELECT_PREFIX_RE.sub(f"SELECT COUNT(*) OVER() AS {_WINDOW_TOTAL_COLUMN},", base_query, count=1)
+
+async def _fetch_page_with_window_count(base_query: str, page: int, page_size: int,
+                                        offset: int) -> Tuple[Optional[List[Dict[str, Any]]], Optional[int]]:
+    """
+    使用COUNT(*) OVER()在一次查询中获取当前页结果和总记录数
+    
+    查询不适合改写、服务器不支持窗口函数或改写后的查询执行失败时返回(None, None)，
+    由调用方改用COUNT子查询。
+    """
+    if _WINDOW_COUNT_UNSAFE_RE.search(base_query):
+        return None, None
+    
+    async with get_db_connection() as connection:
+        if not await _supports_window_count(connection):
+            return None, None
+        
+        window_query = f"{_add_window_count(base_query)} LIMIT {page_size} OFFSET {offset}"
+        try:
+            results = await execute_query(connection, window_query)
+        except Exception as e:
+            logger.warning(f"窗口计数分页查询失败，改用COUNT子查询: {str(e)}")
+            return None, None
+        
+        if not results:
+            # 没有返回行时无法得到窗口计数，第一页即为空结果，其余页码超出范围时单独查询总数
+            total = 0 if page == 1 else await _fetch_total(connection, base_query, page_size)
+            return results, total
+    
+    total = results[0][_WINDOW_TOTAL_COLUMN]
+    for row in results:
+        del row[_WINDOW_TOTAL_COLUMN]
+    # 只有多页的结果才会翻页，单页结果不缓存
+    if total > page_size:
+        _cache_count(base_query, total)
+    return results, total
+
+async def _paginate_by_cursor(base_query: str, cursor: str, cursor_column: str, page_size: int,
+                              include_total: bool = True) -> str:
+    """
+    键集分页：按cursor_column排序，返回该列大于cursor的下一页记录
+    
+    通过索引直接定位到上一页的最后一条记录之后，查询代价与页的深度无关。
+    """
+    # 空游标表示从第一页开始
+    if cursor:
+        condition = f" WHERE sub.`{cursor_column}` > %(cursor)s"
+        params = {'cursor': cursor}
+        # 带参数执行时驱动会对整条SQL做%格式化，基础查询中的%（如LIKE 'a%'）需转义
+        inner_query = base_query.replace('%', '%%')
+    else:
+        condition = ""
+        params = None
+        inner_query = base_query
+    keyset_query = (
+        f"SELECT * FROM ({inner_query}) AS sub{condition} "
+        f"ORDER BY sub.`{cursor_column}` LIMIT {page_size}"
+    )
+    logger.debug("执行键集分页查询: %s, 游标: %s", keyset_query, cursor)
+    
+    dumps = MetadataToolBase.dumps
+    rows = []
+    last_row = None
+    async with get_db_connection() as connection:
+        # 逐行读取并序列化，只保留最后一行用于生成next_cursor
+        async for last_row in iter_query_rows(connection, keyset_query, params):
+            rows.append(dumps(last_row))
+        if not include_total:
+            total = None
+        elif not cursor and len(rows) < page_size:
+            # 第一页未填满时结果集只有这一页，无需COUNT查询
+            total = len(rows)
+        else:
+            # 总记录数与游标位置无关，各页共用计数缓存
+            total = _get_cached_count(base_query)
+            if total is None:
+                total = await _fetch_total(connection, base_query, page_size)
+    
+    has_next = len(rows) == page_size
+    # cursor参数为字符串，next_cursor统一转为字符串以便直接传回
+    next_cursor = last_row.get(cursor_column) if has_next else None
+    metadata_info = {
+        "operation_type": "分页查询",
+        "result_count": len(rows),
+        "pagination": {
+            "mode": "keyset",
+            "cursor": cursor,
+            "cursor_column": cursor_column,
+            "next_cursor": str(next_cursor) if next_cursor is not None else None,
+            "page_size": page_size,
+            "total_records": total,
+            "has_next": has_next
+        }
+    }
+    
+    return _PAGINATION_TEMPLATE % (dumps(metadata_info), f"[{','.join(rows)}]")
+
+async def _fetch_page_json(connection, paginated_query: str) -> Tuple[str, int]:
+    """
+    通过服务端游标逐行读取当前页并立即序列化，返回(结果JSON数组, 行数)
+    
+    每行序列化后即可释放行字典，不会同时持有整页的行字典与序列化结果。
+    """
+    dumps = MetadataToolBase.dumps
+    rows = [dumps(row) async for row in iter_query_rows(connection, paginated_query)]
+    return f"[{','.join(rows)}]", len(rows)
+
+def clear_count_cache() -> None:
+    """清空分页总记录数缓存，数据被修改后调用"""
+    _COUNT_CACHE.clear()
+
+def _cache_count(base_query: str, total: int) -> None:
+    """缓存基础查询的总记录数"""
+    ttl = SQLConfig.PAGINATION_COUNT_CACHE_TTL
+    if ttl <= 0:
+        return
+    if len(_COUNT_CACHE) >= _COUNT_CACHE_MAX_SIZE:
+        # 缓存已满时淘汰最早写入的条目
+        del _COUNT_CACHE[next(iter(_COUNT_CACHE))]
+    _COUNT_CACHE[base_query] = (time.monotonic() + ttl, total)
+
 async def execute_schema_query(
     query: str, 
     params: Optional[Dict[str, Any]] = None, 
@@ -82,9 +373,8 @@ def register_schema_tools(mcp: FastMCP):
             )
         
         # 构建查询
-        table_ref = f"`{table}`" if not database else f"`{database}`.`{table}`"
-        query = f"SHOW INDEX FROM {table_ref}"
-        logger.debug(f"执行查询: {query}")
+        query = f"SHOW INDEX FROM {MetadataToolBase.table_ref(table, database)}"
+        logger.debug("执行查询: %s", query)
         
         # 执行查询
         return await execute_schema_query(query, operation_type="表索引查询")
@@ -123,13 +413,15 @@ def register_schema_tools(mcp: FastMCP):
         else:
             query = "SHOW TABLE STATUS"
             
+        params = None
         if like_pattern:
-            query += f" LIKE '{like_pattern}'"
+            query += " LIKE %(pattern)s"
+            params = {'pattern': like_pattern}
             
-        logger.debug(f"执行查询: {query}")
+        logger.debug("执行查询: %s, 参数: %s", query, params)
         
         # 执行查询
-        return await execute_schema_query(query, operation_type="表状态查询")
+        return await execute_schema_query(query, params, operation_type="表状态查询")
     
     @mcp.tool()
     @MetadataToolBase.handle_query_error
@@ -158,59 +450,93 @@ def register_schema_tools(mcp: FastMCP):
                 "数据库名称只能包含字母、数字和下划线"
             )
         
-        # 确定数据库名
-        db_name = database
-        if not db_name:
-            # 获取当前数据库 - 使用异步上下文管理器
-            async with get_db_connection() as connection:
-                current_db_results = await execute_query(connection, "SELECT DATABASE() as db")
-                if current_db_results and 'db' in current_db_results[0]:
-                    db_name = current_db_results[0]['db']
+        # 使用命名参数，键名与SQL中的占位符对应
+        params = {"table_schema": database or None, "table_name": table}
         
-        if not db_name:
+        logger.debug("执行外键查询: %s", _FOREIGN_KEYS_QUERY)
+        logger.debug("参数: %s", params)
+        
+        # 执行查询
+        async with get_db_connection() as connection:
+            results = await execute_query(connection, _FOREIGN_KEYS_QUERY, params)
+        
+        # 未指定数据库且连接没有选中数据库时DATABASE()为NULL，查询必然为空，
+        # 只在结果为空时确认，避免把配置问题当作没有外键返回
+        if not results and not database and not await get_current_database():
             raise ValueError("无法确定数据库名称，请明确指定database参数")
         
-        # 使用INFORMATION_SCHEMA查询外键 - 修改为使用命名参数
-        query = """
-        SELECT 
-            CONSTRAINT_NAME, 
-            TABLE_NAME,
-            COLUMN_NAME,
-            REFERENCED_TABLE_NAME,
-            REFERENCED_COLUMN_NAME,
-            UPDATE_RULE,
-            DELETE_RULE
-        FROM 
-            INFORMATION_SCHEMA.KEY_COLUMN_USAGE kcu
-        JOIN 
-            INFORMATION_SCHEMA.REFERENTIAL_CONSTRAINTS rc
-        ON 
-            kcu.CONSTRAINT_NAME = rc.CONSTRAINT_NAME
-        WHERE 
-            kcu.TABLE_SCHEMA = %(table_schema)s 
-            AND kcu.TABLE_NAME = %(table_name)s
-            AND kcu.REFERENCED_TABLE_NAME IS NOT NULL
+        return MetadataToolBase.format_results(results, operation_type="表外键查询")
+    
+    @mcp.tool()
+    @MetadataToolBase.handle_query_error
+    async def mysql_show_table_details(table: str, database: Optional[str] = None) -> str:
         """
+        一次获取表的索引、外键约束和表状态信息
         
-        # 使用命名参数，键名与SQL中的占位符对应
-        params = {"table_schema": db_name, "table_name": table}
+        三个查询在同一个连接上依次执行，只获取一次连接，
+        替代分别调用mysql_show_indexes、mysql_show_foreign_keys和mysql_show_table_status
         
-        logger.debug(f"执行外键查询: {query}")
-        logger.debug(f"参数: {params}")
+        Args:
+            table: 表名
+            database: 数据库名称 (可选，默认使用当前连接的数据库)
+            
+        Returns:
+            包含indexes、foreign_keys、status的JSON字符串
+        """
+        # 参数验证
+        MetadataToolBase.validate_parameter(
+            "table", table,
+            SQLValidators.validate_table_name,
+            "表名只能包含字母、数字和下划线"
+        )
         
-        # 执行查询
-        return await execute_schema_query(query, params, operation_type="表外键查询")
+        if database:
+            MetadataToolBase.validate_parameter(
+                "database", database,
+                SQLValidators.validate_database_name,
+                "数据库名称只能包含字母、数字和下划线"
+            )
+        
+        index_query = f"SHOW INDEX FROM {MetadataToolBase.table_ref(table, database)}"
+        status_query = "SHOW TABLE STATUS" if not database else f"SHOW TABLE STATUS FROM `{database}`"
+        
+        # SHOW语句没有结果时execute_query返回占位行，去掉后分别得到空列表
+        strip = MetadataToolBase.strip_empty_marker
+        async with get_db_connection() as connection:
+            indexes = strip(await execute_query(connection, index_query))
+            foreign_keys = await execute_query(
+                connection, _FOREIGN_KEYS_QUERY,
+                {"table_schema": database or None, "table_name": table}
+            )
+            # WHERE Name精确匹配，避免表名中的下划线被LIKE当作通配符
+            status = strip(await execute_query(connection, f"{status_query} WHERE Name = %(table_name)s",
+                                               {"table_name": table}))
+        
+        return MetadataToolBase.dumps({
+            "metadata_info": {"operation_type": "表详细信息查询"},
+            "indexes": indexes,
+            "foreign_keys": foreign_keys,
+            "status": status[0] if status else None
+        })
     
     @mcp.tool()
     @MetadataToolBase.handle_query_error
-    async def mysql_paginate_results(query: str, page: int = 1, page_size: int = 50) -> str:
+    async def mysql_paginate_results(query: str, page: int = 1, page_size: int = 50,
+                                     cursor: Optional[str] = None, cursor_column: str = "id",
+                                     include_total: bool = True) -> str:
         """
         分页执行查询以处理大型结果集
         
+        提供cursor时使用键集分页：返回cursor_column大于cursor的下一页记录，
+        不需要扫描并丢弃前面各页的数据，适合翻到较深的页。
+        
         Args:
             query: SQL查询语句
-            page: 页码 (从1开始)
+            page: 页码 (从1开始，键集分页时忽略)
             page_size: 每页记录数 (默认50)
+            cursor: 上一页返回的next_cursor (可选，提供时使用键集分页，传入空字符串获取第一页)
+            cursor_column: 键集分页使用的有序唯一列 (默认id)
+            include_total: 是否统计总记录数 (默认True，为False时不执行COUNT查询，has_next根据当前页是否填满判断)
             
         Returns:
             分页结果的JSON字符串
@@ -218,13 +544,13 @@ def register_schema_tools(mcp: FastMCP):
         # 参数验证
         MetadataToolBase.validate_parameter(
             "page", page,
-            lambda x: SQLValidators.validate_integer(x, min_value=1),
+            _validate_page,
             "页码必须是正整数"
         )
         
         MetadataToolBase.validate_parameter(
             "page_size", page_size,
-            lambda x: SQLValidators.validate_integer(x, min_value=1, max_value=1000),
+            _validate_page_size,
             "每页记录数必须是正整数且不超过1000"
         )
         
@@ -233,62 +559,91 @@ def register_schema_tools(mcp: FastMCP):
         
         # 分离基础查询和LIMIT/OFFSET部分
         base_query = query.strip()
-        if re.search(r'\bLIMIT\b', base_query, re.IGNORECASE):
+        if _has_limit_clause(base_query):
             raise ValueError("查询语句已包含LIMIT子句，不能与分页功能一起使用")
             
+        # 确认查询安全性 - 限制查询类型，只允许SELECT查询
+        if not _SELECT_PREFIX_RE.match(base_query):
+            raise ValueError("只支持SELECT查询进行分页")
+        
+        if cursor is not None:
+            MetadataToolBase.validate_parameter(
+                "cursor_column", cursor_column,
+                SQLValidators.validate_column_name,
+                "列名只能包含字母、数字和下划线"
+            )
+            return await _paginate_by_cursor(base_query, cursor, cursor_column, page_size, include_total)
+            
         # 添加LIMIT和OFFSET
         paginated_query = f"{base_query} LIMIT {page_size} OFFSET {offset}"
         
-        logger.debug(f"执行分页查询: {paginated_query}")
-        logger.debug(f"页码: {page}, 每页记录数: {page_size}, 偏移量: {offset}")
+        logger.debug("执行分页查询: %s", paginated_query)
+        logger.debug("页码: %d, 每页记录数: %d, 偏移量: %d", page, page_size, offset)
         
-        # 执行查询 - 使用异步上下文管理器
-        async with get_db_connection() as connection:
-            # 首先检查并验证查询
-            # 确认查询安全性 - 限制查询类型，只允许SELECT查询
-            if not base_query.strip().upper().startswith('SELECT'):
-                raise ValueError("只支持SELECT查询进行分页")
-                
-            # 使用普通查询获取当前页结果（不需要流式处理，因为已经有LIMIT限制）
-            results = await execute_query(connection, paginated_query)
-            
-            # 尝试获取总记录数 - 对于大型结果集使用流式处理
-            try:
-                # 由于无法参数化子查询，我们改为构建一个只返回计数的查询
-                # 这仍有SQL注入风险，但我们已经验证查询只能是SELECT
-                count_query = f"SELECT COUNT(*) as total FROM ({base_query}) as subquery"
-                # 计数查询通常只返回一行，不需要流式处理
-                count_results = await execute_query(connection, count_query)
-                total = count_results[0]['total'] if count_results else 0
-                
-                # 根据总记录数计算是否是大型结果集
-                is_large_resultset = total > 1000
-                
-                # 提示用户结果集大小
-                if is_large_resultset:
-                    logger.info(f"检测到大型结果集，共 {total} 条记录，建议使用较小的 page_size 值")
-                
-            except Exception as e:
-                logger.warning(f"无法执行总数查询: {str(e)}")
-                total = None
-                is_large_resultset = False
-                
-            # 构造分页元数据
-            pagination_info = {
-                "metadata_info": {
-                    "operation_type": "分页查询",
-                    "result_count": len(results),
-                    "pagination": {
-                        "page": page,
-                        "page_size": page_size,
-                        "total_records": total,
-                        "total_pages": (total + page_size - 1) // page_size if total else None,
-                        "has_next": (page * page_size < total) if total is not None else len(results) == page_size,
-                        "has_previous": page > 1,
-                        "is_large_resultset": is_large_resultset if total is not None else None
-                    }
-                },
-                "results": results
+        # 使用普通查询获取当前页结果（不需要流式处理，因为已经有LIMIT限制）
+        total = _get_cached_count(base_query) if include_total else None
+        if include_total and total is None:
+            # 服务器支持时一次查询同时得到当前页和总记录数，不支持时返回(None, None)
+            results, total = await _fetch_page_with_window_count(base_query, page, page_size, offset)
+        else:
+            results = None
+        
+        if results is not None:
+            # 已由窗口计数查询得到
+            results_json, result_count = MetadataToolBase.dumps(results), len(results)
+        elif total is not None or not include_total:
+            # 计数已缓存或不需要总数，只需查询当前页
+            async with get_db_connection() as connection:
+                results_json, result_count = await _fetch_page_json(connection, paginated_query)
+        else:
+            async with get_db_connection() as connection:
+                # 第一页先查询当前页：结果集不超过一页（最常见的情况）时由页内行数直接得到总数，不执行COUNT查询。
+                # 后续页在连接池中还有空闲连接时才获取第二个连接并发执行计数查询（同一连接上的操作只能串行）；
+                # 持有一个连接再等待另一个连接时，并发的分页调用占满连接池后会相互等待直至超时
+                pool = get_pool_for_current_loop()
+                if page > 1 and _CONCURRENT_COUNT_ENABLED and pool is not None and pool.freesize > 0:
+                    # 等待两个查询都结束后再归还连接，避免当前页查询失败时计数查询仍在连接上执行
+                    async with get_db_connection() as count_connection:
+                        page_result, total = await asyncio.gather(
+                            _fetch_page_json(connection, paginated_query),
+                            _fetch_total(count_connection, base_query, page_size),
+                            return_exceptions=True
+                        )
+                    if isinstance(page_result, BaseException):
+                        raise page_result
+                    if isinstance(total, BaseException):
+                        # 计数失败不影响当前页结果，总记录数按未知处理
+                        logger.warning(f"无法执行总数查询: {str(total)}")
+                        total = None
+                    results_json, result_count = page_result
+                else:
+                    results_json, result_count = await _fetch_page_json(connection, paginated_query)
+                    if result_count < page_size and (result_count or page == 1):
+                        # 当前页未填满即为最后一页，总数可直接算出，无需执行COUNT查询
+                        total = offset + result_count
+                    else:
+                        total = await _fetch_total(connection, base_query, page_size)
+        
+        # 根据总记录数计算是否是大型结果集
+        is_large_resultset = total > 1000 if total is not None else None
+        
+        # 提示用户结果集大小
+        if is_large_resultset:
+            logger.info("检测到大型结果集，共 %d 条记录，建议使用较小的 page_size 值", total)
+        
+        # 构造分页元数据
+        metadata_info = {
+            "operation_type": "分页查询",
+            "result_count": result_count,
+            "pagination": {
+                "page": page,
+                "page_size": page_size,
+                "total_records": total,
+                "total_pages": -(-total // page_size) if total else None,
+                "has_next": (page * page_size < total) if total is not None else result_count == page_size,
+                "has_previous": page > 1,
+                "is_large_resultset": is_large_resultset
             }
-            
-            return json.dumps(pagination_info, default=str) 
\ No newline at end of file
+        }
+        
+        return _PAGINATION_TEMPLATE % (MetadataToolBase.dumps(metadata_info), results_json) 
\ No newline at end of file
@@ -1,17 +1,14 @@
-import json
 import logging
-import aiomysql
 from typing import Any, Dict, Optional, List
 from mcp.server.fastmcp import FastMCP
 from src.db.mysql_operations import get_db_connection, execute_query
 from src.config import SecurityConfig
+from src.security.sql_parser import SQLParser
 from .metadata_base_tool import MetadataToolBase,QueryExecutionError
+from .mysql_schema_tool import clear_count_cache
 
 logger = logging.getLogger("mysql_server")
 
-# MySQL可用性检查变量，默认认为aiomysql已可用
-mysql_available = True
-
 
 def register_mysql_tool(mcp: FastMCP):
     """
@@ -40,26 +37,34 @@ def register_mysql_tool(mcp: FastMCP):
         Returns:
             查询结果的JSON字符串
         """
-        logger.debug(f"执行MySQL查询: {query}, 参数: {params}")
+        logger.debug("执行MySQL查询: %s, 参数: %s", query, params)
 
-        if SecurityConfig.ALLOWED_TABLE_NAMES and not set(use_tables).issubset(
-            SecurityConfig.ALLOWED_TABLE_NAMES
-        ):
-            logger.error(f"访问被拒绝: 表 '{name}' 未在允许列表中")
-            raise QueryExecutionError(f"{entity_type} '{name}' 不允许访问")
+        allowed_tables = SecurityConfig.ALLOWED_TABLE_NAMES
+        if allowed_tables and use_tables:
+            # 遇到第一个不在允许列表中的表即拒绝，无需构造集合
+            denied = next((t for t in use_tables if t not in allowed_tables), None)
+            if denied is not None:
+                logger.error(f"访问被拒绝: 表 '{denied}' 未在允许列表中")
+                raise QueryExecutionError(f"表 '{denied}' 不允许访问")
 
         async with get_db_connection() as connection:
             results = await execute_query(connection, query, params)
 
-            # 检查是否是修改操作返回的影响行数
-            operation = query.strip().split()[0].upper()
+            # 检查是否是修改操作返回的影响行数（解析结果已由execute_query缓存）
+            parsed_sql = SQLParser.parse_query(query)
+            operation = parsed_sql.operation_type
+            
+            # 表结构或数据变更后缓存的元数据结果和分页总记录数可能已过期
+            if parsed_sql.category == 'DDL' or (parsed_sql.category == 'DML' and operation != 'SELECT'):
+                MetadataToolBase.clear_metadata_cache()
+                clear_count_cache()
             if (
                 operation in {"UPDATE", "DELETE", "INSERT"}
                 and results
                 and "affected_rows" in results[0]
             ):
                 affected_rows = results[0]["affected_rows"]
-                logger.info(f"{operation}操作影响了{affected_rows}行数据")
+                logger.info("%s操作影响了%d行数据", operation, affected_rows)
 
             # 添加元数据信息
             metadata_info = {
@@ -70,4 +75,4 @@ def register_mysql_tool(mcp: FastMCP):
                 "results": results,
             }
 
-            return json.dumps(metadata_info, default=str)
+            return MetadataToolBase.dumps(metadata_info)
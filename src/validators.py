@@ -1,4 +1,5 @@
-import re
+import functools
+import string
 from typing import Any, Callable, Optional
 
 class ValidationError(Exception):
@@ -8,9 +9,13 @@ class ValidationError(Exception):
 class SQLValidators:
     """SQL相关验证器集合"""
     
-    # 正则表达式常量
-    IDENTIFIER_PATTERN = r'^[a-zA-Z0-9_]+$'
-    PATTERN_PATTERN = r'^[a-zA-Z0-9_%]+$'
+    # 合法字符删除表：删除所有合法字符后为空串即表示只包含合法字符
+    _IDENTIFIER_DELETE = str.maketrans('', '', string.ascii_letters + string.digits + '_')
+    _PATTERN_DELETE = str.maketrans('', '', string.ascii_letters + string.digits + '_%')
+    
+    # 常用验证的检查结果按参数缓存：同一表名、库名等会被反复验证。
+    # 只有验证通过的结果会被缓存（验证失败时抛出异常）；类型在进入缓存前检查，
+    # 列表等不可哈希的值或1.0等类型不符的值直接得到验证错误
     
     @staticmethod
     def validate_identifier(name: str, entity_type: str = "标识符") -> bool:
@@ -29,8 +34,15 @@ class SQLValidators:
         """
         if not name:
             raise ValidationError(f"{entity_type}不能为空")
-            
-        if not re.match(SQLValidators.IDENTIFIER_PATTERN, name):
+        if not isinstance(name, str):
+            raise ValidationError(f"{entity_type}必须是字符串，当前类型: {type(name).__name__}")
+        return SQLValidators._check_identifier(name, entity_type)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _check_identifier(name: str, entity_type: str) -> bool:
+        """检查标识符只包含合法字符（name已确认为非空字符串）"""
+        if name.translate(SQLValidators._IDENTIFIER_DELETE):
             raise ValidationError(f"无效的{entity_type}: {name}, {entity_type}只能包含字母、数字和下划线")
         return True
     
@@ -65,8 +77,15 @@ class SQLValidators:
         """
         if not pattern:
             raise ValidationError("模式不能为空")
-            
-        if not re.match(SQLValidators.PATTERN_PATTERN, pattern):
+        if not isinstance(pattern, str):
+            raise ValidationError(f"模式必须是字符串，当前类型: {type(pattern).__name__}")
+        return SQLValidators._check_like_pattern(pattern)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _check_like_pattern(pattern: str) -> bool:
+        """检查模式只包含合法字符（pattern已确认为非空字符串）"""
+        if pattern.translate(SQLValidators._PATTERN_DELETE):
             raise ValidationError(f"无效的模式: {pattern}, 模式只能包含字母、数字、下划线和通配符(%_)")
         return True
     
@@ -88,7 +107,12 @@ class SQLValidators:
         """
         if not isinstance(value, int):
             raise ValidationError(f"值必须是整数，当前类型: {type(value).__name__}")
-            
+        return SQLValidators._check_integer_range(value, min_value, max_value)
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _check_integer_range(value: int, min_value: Optional[int], max_value: Optional[int]) -> bool:
+        """检查整数值在允许范围内（value已确认为整数）"""
         if min_value is not None and value < min_value:
             raise ValidationError(f"值必须大于或等于 {min_value}")
             
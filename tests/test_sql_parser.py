@@ -0,0 +1,72 @@
+"""
+SQLParser快速解析路径与完整解析的一致性测试
+"""
+import sqlparse
+
+from src.security.sql_parser import SQLParser
+
+# 快速解析与完整解析都会比较的字段
+_COMPARED_FIELDS = ('operation_type', 'tables', 'has_where', 'has_limit', 'category')
+
+# 快速路径可处理的语句
+FAST_QUERIES = [
+    "SELECT * FROM t",
+    "select id from t where a > 1 limit 3",
+    "SELECT * FROM db.t WHERE id = 1",
+    "SELECT * FROM a JOIN b ON a.id = b.id WHERE x = 1 LIMIT 5",
+    "SELECT a FROM t ORDER BY a DESC",
+    "SHOW TABLES",
+    "SHOW TABLES FROM db",
+    "DESC t",
+    "DESCRIBE t",
+    "DESC db.t",
+]
+
+# 含反引号、字符串字面量或注释，快速路径应交给完整解析
+REJECTED_QUERIES = [
+    "SELECT * FROM `my table`",
+    "SELECT `limit` FROM t",
+    "SELECT * FROM t WHERE name = 'where'",
+    'SELECT * FROM t WHERE name = "limit"',
+    "SELECT * FROM t -- LIMIT 1",
+    "SELECT * FROM t /* LIMIT 1 */",
+    "SELECT * FROM t # LIMIT 1",
+]
+
+
+def _full_parse(sql):
+    """不经快速路径的完整解析结果"""
+    stmt = sqlparse.parse(SQLParser._normalize_for_parse(sql))[0]
+    operation_type, tables, has_where, has_limit = SQLParser._analyze(stmt)
+    return {
+        'operation_type': operation_type,
+        'tables': tables,
+        'has_where': has_where,
+        'has_limit': has_limit,
+        'category': SQLParser._get_operation_category(operation_type),
+    }
+
+
+def test_fast_path_matches_full_parse():
+    for sql in FAST_QUERIES:
+        fast = SQLParser.try_parse_fast(sql)
+        assert fast is not None, sql
+        expected = _full_parse(sql)
+        assert {field: fast[field] for field in _COMPARED_FIELDS} == expected, sql
+
+
+def test_fast_path_rejects_quoted_and_commented_sql():
+    for sql in REJECTED_QUERIES:
+        assert SQLParser.try_parse_fast(sql) is None, sql
+
+
+def test_parse_query_on_rejected_sql():
+    assert SQLParser.parse_query("SELECT * FROM `my table`").tables == ('my table',)
+    assert SQLParser.parse_query("SELECT `limit` FROM t").has_limit is False
+
+
+def test_desc_is_metadata():
+    for sql in ("DESC t", "DESCRIBE t"):
+        parsed = SQLParser.parse_query(sql)
+        assert parsed.category == 'METADATA', sql
+        assert _full_parse(sql)['category'] == 'METADATA', sql